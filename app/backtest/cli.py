@@ -0,0 +1,139 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from backtest.engine import STRATEGIES, load_closes, run_backtests
+from backtest.walk_forward import walk_forward
+
+
+def parse_value(text: str):
+    # "20" -> 20, "0.5" -> 0.5, "monthly" -> "monthly"
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(items: list) -> dict:
+    # ["window=5:100:5", "freq=weekly,monthly"] -> {"window": range(5, 101, 5), "freq": ["weekly", "monthly"]}
+    # a:b[:pas] est une plage d'entiers bornes incluses.
+    grid = {}
+    for item in items or []:
+        name, _, spec = item.partition("=")
+        if not spec:
+            raise ValueError(f"Grid entry {item} must look like name=values.")
+        if ":" in spec:
+            bounds = [int(v) for v in spec.split(":")]
+            step = bounds[2] if len(bounds) > 2 else 1
+            grid[name] = list(range(bounds[0], bounds[1] + 1, step))
+        else:
+            grid[name] = [parse_value(v) for v in spec.split(",")]
+    return grid
+
+
+def parse_params(items: list) -> dict:
+    params = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        params[name] = parse_value(value)
+    return params
+
+
+def write_results(table: pd.DataFrame, output: str):
+    # Extension du fichier -> format (.parquet, .csv, sinon JSON) ; sans fichier, JSON sur la sortie standard.
+    if output is None:
+        json.dump(json.loads(table.to_json(orient="records")), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif output.endswith(".parquet"):
+        table.to_parquet(output, index=False)
+    elif output.endswith(".csv"):
+        table.to_csv(output, index=False)
+    else:
+        table.to_json(output, orient="records", indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="backtest", description="Run dashboard strategies without the web interface.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the available strategies")
+
+    run = commands.add_parser("run", help="backtest a strategy, optionally over a parameter grid")
+    run.add_argument("--strategy", required=True, choices=list(STRATEGIES))
+    run.add_argument("--tickers", nargs="+", required=True)
+    run.add_argument("--start", required=True, help="first date of the price history")
+    run.add_argument("--end", default=pd.Timestamp.today().strftime("%Y-%m-%d"))
+    run.add_argument("--invest", help="first investment date (single-asset strategies, default --start)")
+    run.add_argument("--interval", default="1d")
+    run.add_argument("--capital", type=float, default=1000)
+    run.add_argument("--rf", type=float, default=0.0, help="annual risk-free rate (0.03 = 3%%)")
+    run.add_argument("--weights", nargs="+", type=float, help="portfolio weights (default: equal)")
+    run.add_argument("--param", nargs="*", help="fixed parameters, e.g. window=20")
+    run.add_argument("--grid", nargs="*", help="swept parameters, e.g. window=5:100:5 freq=weekly,monthly")
+    run.add_argument("--workers", type=int)
+    run.add_argument("--output", help="result file (.json, .csv or .parquet, default: JSON on stdout)")
+
+    forecast = commands.add_parser("walk-forward", help="walk-forward accuracy of the ARIMA forecast")
+    forecast.add_argument("--ticker", required=True)
+    forecast.add_argument("--start", required=True, help="first date of the price history")
+    forecast.add_argument("--end", default=pd.Timestamp.today().strftime("%Y-%m-%d"))
+    forecast.add_argument("--from", dest="first_origin", help="first forecast origin (default: after --min-history bars)")
+    forecast.add_argument("--horizon", type=int, default=30, help="forecast horizon in days")
+    forecast.add_argument("--step", type=int, default=5, help="bars between two forecast origins")
+    forecast.add_argument("--min-history", type=int, default=250, help="bars needed before the first origin")
+    forecast.add_argument("--alpha", type=float, default=0.05, help="1 - confidence level of the bands")
+    forecast.add_argument("--workers", type=int)
+    forecast.add_argument("--output", help="summary per horizon (.json, .csv or .parquet, default: JSON on stdout)")
+    forecast.add_argument("--errors", help="also write one row per origin and horizon to this file")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, spec in STRATEGIES.items():
+            print(f"{name:<22} {spec['kind']}")
+        return
+
+    if args.command == "walk-forward":
+        closes, errors = load_closes([args.ticker], args.start, args.end)
+        if closes.empty:
+            parser.exit(1, f"No data for {args.ticker}: {errors.get(args.ticker, 'empty history')}.\n")
+        detail, summary = walk_forward(
+            closes[args.ticker],
+            horizon=args.horizon,
+            step=args.step,
+            min_history=args.min_history,
+            start=args.first_origin,
+            alpha=args.alpha,
+            max_workers=args.workers,
+        )
+        if args.errors:
+            write_results(detail, args.errors)
+        write_results(summary, args.output)
+        return
+
+    closes, errors = load_closes(args.tickers, args.start, args.end, args.interval)
+    for ticker, error in errors.items():
+        print(f"{ticker}: {error}", file=sys.stderr)
+    if closes.empty:
+        parser.exit(1, "No data for any ticker.\n")
+    table = run_backtests(
+        args.strategy,
+        closes,
+        grid=parse_grid(args.grid),
+        params=parse_params(args.param),
+        start=args.invest or args.start,
+        capital=args.capital,
+        weights=args.weights,
+        rf=args.rf,
+        interval=args.interval,
+        max_workers=args.workers,
+    )
+    table.insert(0, "strategy", args.strategy)
+    write_results(table, args.output)
+
+
+if __name__ == "__main__":
+    main()
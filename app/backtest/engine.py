@@ -0,0 +1,98 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from backtest.metrics import METRICS, metrics_kernel, years_between
+from backtest.sweep import as_values, run_sweep
+from market_data.bars import PERIODS_PER_YEAR
+from market_data.store import load_prices_many
+from portfolio.strategies.alloc_return import rebalancing_proportional_returns
+from portfolio.strategies.allocation import allocation_hold
+from portfolio.strategies.rebalancing import rebalancing
+from portfolio.verifcation.weight_check import check_weights
+from single_asset.strategies.DCA import dca_money_weighted, dca_schedule, dca_time_weighted
+from single_asset.strategies.buy_and_hold import buy_and_hold
+from single_asset.strategies.momentum import run_momentum
+
+
+def full_metrics(values: pd.Series, rf: float = 0.0, periods: int = 252) -> dict:
+    # Toutes les metriques de backtest.metrics plus la valeur finale (valeurs nulles avant investissement ignorees).
+    values = as_values(values)
+    values = values[values > 0].dropna()
+    if len(values) < 3:
+        return {**{name: np.nan for name in METRICS}, "final_value": np.nan}
+    stats = metrics_kernel(values.to_numpy(), years=years_between(values.index), rf=rf, periods=periods)
+    return {**{name: float(stats[name]) for name in METRICS}, "final_value": float(values.iloc[-1])}
+
+
+def dca_metrics(schedule: pd.DataFrame, rf: float = 0.0, periods: int = 252) -> dict:
+    # La valeur du DCA grossit aussi avec les versements : les metriques de rendement sont calculees
+    # sur la trajectoire nette des versements (dca_time_weighted), completees du TRI des versements,
+    # du total investi et de la valeur finale reelle.
+    stats = full_metrics(dca_time_weighted(schedule), rf, periods)
+    return {**stats, "money_weighted_return": dca_money_weighted(schedule),
+            "invested": float(schedule["Invested"].iloc[-1]), "final_value": float(schedule["Portefeuille"].iloc[-1])}
+
+
+# Strategies utilisables sans interface.
+# kind : "single" (une serie de prix, un backtest par ticker) ou "portfolio" (tous les tickers ensemble).
+# inputs : arguments fournis par le moteur, le reste vient de --param / --grid.
+# metrics : metriques propres a la strategie (full_metrics par defaut).
+STRATEGIES = {
+    "buy_and_hold": {"function": buy_and_hold, "kind": "single", "inputs": ("data", "start", "capital")},
+    "momentum": {"function": run_momentum, "kind": "single", "inputs": ("data", "start", "capital")},
+    "dca": {"function": dca_schedule, "kind": "single", "inputs": ("data", "start", "capital"),
+            "metrics": dca_metrics},
+    "allocation_hold": {"function": allocation_hold, "kind": "portfolio",
+                        "inputs": ("data", "selected_assets", "weights", "capital")},
+    "rebalancing": {"function": rebalancing, "kind": "portfolio", "inputs": ("data", "capital", "weights")},
+    "proportional_returns": {"function": rebalancing_proportional_returns, "kind": "portfolio",
+                             "inputs": ("data", "capital")},
+}
+
+
+def load_closes(tickers: list, start, end, interval: str = "1d") -> tuple:
+    # Clotures des tickers (une colonne par ticker) depuis la base locale, et erreurs par ticker.
+    frames, errors = load_prices_many(tickers, start, end, interval)
+    closes = pd.DataFrame({t: frames[t]["Close"] for t in tickers if t in frames})
+    return closes, errors
+
+
+def on_ticker(closes: pd.DataFrame, strategy: str, inputs: dict, ticker: str, **params):
+    # Strategie mono-actif appliquee a une colonne : le ticker est un parametre de la grille.
+    return STRATEGIES[strategy]["function"](data=closes[ticker].dropna(), **inputs, **params)
+
+
+def on_portfolio(closes: pd.DataFrame, strategy: str, inputs: dict, **params):
+    return STRATEGIES[strategy]["function"](data=closes, **inputs, **params)
+
+
+def run_backtests(strategy: str, closes: pd.DataFrame, grid: dict = None, params: dict = None, start=None,
+                  capital: float = 1000, weights: list = None, rf: float = 0.0, interval: str = "1d",
+                  max_workers: int = None) -> pd.DataFrame:
+    # Une ligne de metriques par (ticker,) combinaison de parametres, calculees sur un pool de processus.
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy}, choose among {', '.join(STRATEGIES)}.")
+    spec = STRATEGIES[strategy]
+    tickers = list(closes.columns)
+    if weights is None:
+        weights = [1 / len(tickers)] * len(tickers)
+    available = {
+        "start": pd.Timestamp(start) if start is not None else closes.index[0],
+        "capital": capital,
+        "selected_assets": tickers,
+        "weights": check_weights(list(weights)),
+    }
+    inputs = {**{name: available[name] for name in spec["inputs"] if name != "data"}, **(params or {})}
+    grid = {name: list(values) for name, values in (grid or {}).items()}
+    metrics = functools.partial(spec.get("metrics", full_metrics), periods=PERIODS_PER_YEAR.get(interval, 252))
+
+    if spec["kind"] == "single":
+        return run_sweep(on_ticker, {"ticker": tickers, **grid},
+                         {"closes": closes, "strategy": strategy, "inputs": inputs},
+                         rf=rf, max_workers=max_workers, metrics=metrics)
+    if not grid:
+        return pd.DataFrame([metrics(on_portfolio(closes, strategy, inputs), rf)])
+    return run_sweep(on_portfolio, grid, {"closes": closes, "strategy": strategy, "inputs": inputs},
+                     rf=rf, max_workers=max_workers, metrics=metrics)
@@ -0,0 +1,67 @@
+import numpy as np
+
+METRICS = ["total_return", "cagr", "volatility", "sharpe", "sortino", "max_drawdown", "var"]
+
+
+def metrics_kernel(x: np.ndarray, years=None, rf: float = 0.0, periods: int = 252,
+                   confidence: float = 0.95, kind: str = "values") -> dict:
+    # Toutes les metriques d'une ou plusieurs trajectoires en un seul appel vectorise : les rendements sont
+    # calcules une fois puis parcourus par quelques operations numpy (sommes, cumul du pic, quantile).
+    # x : valeurs (ou rendements si kind="returns"), 1-D ou 2-D (une trajectoire par ligne).
+    # years : duree en annees (par defaut nombre de rendements / periods).
+    # Resultats en fractions : cagr 0.12 = 12 %, max_drawdown et var sont negatifs.
+    # Avec kind="returns", la trajectoire part de 1 : cette valeur initiale compte comme premier sommet
+    # (un premier rendement negatif est donc un drawdown).
+    x = np.asarray(x, dtype=float)
+    if kind == "returns":
+        returns = x
+        growth = np.cumprod(1 + returns, axis=-1)
+        values = np.concatenate([np.ones(growth.shape[:-1] + (1,)), growth], axis=-1)
+    else:
+        values = x
+        returns = values[..., 1:] / values[..., :-1] - 1
+
+    n = returns.shape[-1]
+    if n < 2:
+        nan = np.full(values.shape[:-1], np.nan)
+        return {name: nan[()] for name in METRICS}
+    if years is None:
+        years = n / periods
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        # moments des rendements et de leur partie negative (sommes simples)
+        s1 = returns.sum(axis=-1)
+        s2 = np.einsum("...i,...i->...", returns, returns)
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 - s1 * mean, 0) / (n - 1))
+        downside = np.minimum(returns, 0)
+        n_down = np.count_nonzero(downside, axis=-1)
+        d1 = downside.sum(axis=-1)
+        d2 = np.einsum("...i,...i->...", downside, downside)
+        down_std = np.sqrt(np.maximum(d2 - d1 * d1 / np.maximum(n_down, 1), 0) / (n_down - 1))
+
+        excess = mean - rf / periods
+        sharpe = np.where(std > 1e-12, excess / std * np.sqrt(periods), np.nan)
+        sortino = np.where(n_down == 0, np.where(excess > 0, np.inf, np.nan),
+                           np.where(down_std > 1e-12, excess / down_std * np.sqrt(periods), np.nan))
+
+        first, last = values[..., 0], values[..., -1]
+        total_return = last / first - 1
+        cagr = np.where((np.asarray(years) > 0) & (first > 0), (last / first) ** (1 / np.asarray(years)) - 1, np.nan)
+        max_drawdown = np.min(values / np.maximum.accumulate(values, axis=-1) - 1, axis=-1)
+        var = np.quantile(returns, 1 - confidence, axis=-1)
+
+    result = {
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": std * np.sqrt(periods),
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown": max_drawdown,
+        "var": var,
+    }
+    return {name: np.asarray(value)[()] for name, value in result.items()}
+
+
+def years_between(index) -> float:
+    return (index[-1] - index[0]).days / 365.25
@@ -0,0 +1,143 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class OnlineMetrics:
+    # Accumulateurs en ligne des metriques d'une trajectoire de valeurs :
+    # variance de Welford des rendements (et des rendements negatifs pour le Sortino),
+    # plus haut et drawdown courants, premiere/derniere valeur pour le CAGR.
+    # update() ne coute que le nombre de nouvelles barres ; l'etat se sauvegarde avec to_dict().
+    def __init__(self):
+        self.first_value = np.nan
+        self.first_time = None
+        self.last_value = np.nan
+        self.last_time = None
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.down_count, self.down_mean, self.down_m2 = 0, 0.0, 0.0
+
+    @staticmethod
+    def merge(count, mean, m2, batch: np.ndarray) -> tuple:
+        # Fusion (Chan et al.) d'un lot de rendements dans l'etat de Welford.
+        k = len(batch)
+        if k == 0:
+            return count, mean, m2
+        batch_mean = batch.mean()
+        batch_m2 = np.sum((batch - batch_mean) ** 2)
+        total = count + k
+        delta = batch_mean - mean
+        return total, mean + delta * k / total, m2 + batch_m2 + delta * delta * count * k / total
+
+    def update(self, values: np.ndarray, times) -> "OnlineMetrics":
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return self
+        if self.first_time is None:
+            self.first_value, self.first_time = values[0], times[0]
+            returns = values[1:] / values[:-1] - 1
+        else:
+            returns = np.diff(values, prepend=self.last_value) / np.concatenate(([self.last_value], values[:-1]))
+        self.count, self.mean, self.m2 = self.merge(self.count, self.mean, self.m2, returns)
+        self.down_count, self.down_mean, self.down_m2 = self.merge(
+            self.down_count, self.down_mean, self.down_m2, returns[returns < 0]
+        )
+        peaks = np.maximum.accumulate(np.maximum(values, self.peak))
+        self.max_drawdown = min(self.max_drawdown, np.min(values / peaks - 1))
+        self.peak = peaks[-1]
+        self.last_value, self.last_time = values[-1], times[-1]
+        return self
+
+    def metrics(self, rf: float = 0.0, periods: int = 252) -> dict:
+        # Memes definitions que backtest.metrics.metrics_kernel (hors VaR, qui demande tout l'historique).
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        down_std = np.sqrt(self.down_m2 / (self.down_count - 1)) if self.down_count > 1 else np.nan
+        excess = self.mean - rf / periods
+        years = (pd.Timestamp(self.last_time) - pd.Timestamp(self.first_time)).days / 365.25 if self.count else 0
+        if self.down_count == 0:
+            sortino = np.inf if excess > 0 else np.nan
+        else:
+            sortino = excess / down_std * np.sqrt(periods) if down_std > 1e-12 else np.nan
+        return {
+            "total_return": self.last_value / self.first_value - 1,
+            "cagr": (self.last_value / self.first_value) ** (1 / years) - 1 if years > 0 else np.nan,
+            "volatility": std * np.sqrt(periods),
+            "sharpe": excess / std * np.sqrt(periods) if std > 1e-12 else np.nan,
+            "sortino": sortino,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    def copy(self) -> "OnlineMetrics":
+        return copy.copy(self)
+
+    def to_dict(self) -> dict:
+        state = dict(vars(self))
+        state["first_time"] = None if self.first_time is None else pd.Timestamp(self.first_time).isoformat()
+        state["last_time"] = None if self.last_time is None else pd.Timestamp(self.last_time).isoformat()
+        return {k: (float(v) if isinstance(v, np.floating) else v) for k, v in state.items()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "OnlineMetrics":
+        online = cls()
+        online.__dict__.update(state)
+        online.first_time = None if state["first_time"] is None else pd.Timestamp(state["first_time"])
+        online.last_time = None if state["last_time"] is None else pd.Timestamp(state["last_time"])
+        return online
+
+
+# Etats sauvegardes par trajectoire (partages entre sessions, la page se recharge toutes les 5 minutes).
+STATES = OrderedDict()
+STATES_SIZE = 256
+LOCK = threading.Lock()
+
+
+def online_metrics(key, portfolio: pd.Series, rf: float = 0.0, periods: int = 252) -> dict:
+    # Metriques de `portfolio` en n'ajoutant que les barres apparues depuis l'appel precedent.
+    # `key` identifie la trajectoire (ticker, strategie, parametres, date de debut).
+    # La derniere barre (journee en cours) est provisoire : elle est appliquee a une copie de l'etat.
+    # L'etat partage n'est jamais modifie : on met a jour une copie, remplacee sous verrou seulement si
+    # aucune autre session n'a deja enregistre un etat plus avance.
+    with LOCK:
+        state = STATES.get(key)
+    if state is not None:
+        pos = int(portfolio.index.searchsorted(state.last_time))
+        # historique reecrit (barre passee revisee, periode raccourcie) : on repart de zero
+        if pos >= len(portfolio) or portfolio.index[pos] != state.last_time or portfolio.iloc[pos] != state.last_value:
+            state = None
+    if state is None:
+        new = portfolio[portfolio > 0]
+        if len(new) < 3:
+            return OnlineMetrics().metrics(rf, periods)
+        state = OnlineMetrics()
+    else:
+        new = portfolio.iloc[pos + 1:]
+        new = new[new > 0]
+        state = state.copy()
+    if len(new) == 0:
+        return state.metrics(rf, periods)
+
+    state.update(new.to_numpy()[:-1], new.index[:-1])
+    with LOCK:
+        current = STATES.get(key)
+        if current is None or state.last_time >= current.last_time:
+            STATES[key] = state
+        STATES.move_to_end(key)
+        while len(STATES) > STATES_SIZE:
+            STATES.popitem(last=False)
+    return state.copy().update(new.to_numpy()[-1:], new.index[-1:]).metrics(rf, periods)
+
+
+def online_strategy_metrics(key, portfolio: pd.Series, rf: float = 0.0, periods: int = 252,
+                            confidence: float = 0.95) -> dict:
+    # Metriques affichees pour la trajectoire d'une strategie : les accumulateurs de online_metrics
+    # (etat sauvegarde sous `key` avec les parametres de la strategie) plus la VaR historique,
+    # seule metrique qui demande tous les rendements.
+    stats = online_metrics(key, portfolio, rf, periods)
+    values = portfolio[portfolio > 0].to_numpy(dtype=float)
+    returns = values[1:] / values[:-1] - 1
+    stats["var"] = float(np.quantile(returns, 1 - confidence)) if len(returns) > 1 else np.nan
+    return stats
@@ -0,0 +1,85 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import numpy as np
+import pandas as pd
+
+from charts.decimate import line_trace
+
+
+def sweep_heatmap(table: pd.DataFrame, x: str, metric: str, y: str = None) -> go.Figure:
+    # Heatmap d'une metrique du sweep : x (et y) sont les parametres balayes.
+    if y is None:
+        z = [table.sort_values(x)[metric].to_list()]
+        y_labels = [metric]
+        x_labels = sorted(table[x].to_list())
+    else:
+        pivot = table.pivot(index=y, columns=x, values=metric)
+        z = pivot.to_numpy()
+        y_labels = pivot.index.to_list()
+        x_labels = pivot.columns.to_list()
+    fig = go.Figure(go.Heatmap(z=z, x=x_labels, y=y_labels, colorscale="RdYlGn", colorbar=dict(title=metric)))
+    fig.update_layout(
+        title=f"{metric} by parameters",
+        xaxis_title=x,
+        yaxis_title=y or "",
+        height=500,
+        margin=dict(l=40, r=40, t=40, b=40)
+    )
+    return fig
+
+
+def rolling_metrics_figure(rolling: pd.DataFrame, window=None) -> go.Figure:
+    # Une ligne par metrique glissante, axes x partages.
+    fig = make_subplots(rows=len(rolling.columns), cols=1, shared_xaxes=True, subplot_titles=list(rolling.columns))
+    for i, column in enumerate(rolling.columns):
+        fig.add_trace(line_trace(rolling[column], column, window=window), row=i + 1, col=1)
+    fig.update_layout(
+        title="Rolling metrics",
+        height=150 * len(rolling.columns) + 100,
+        showlegend=False,
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
+
+
+def correlation_heatmap(corr: pd.DataFrame, max_cells: int = 400) -> go.Figure:
+    # Au-dela de max_cells actifs, la matrice est moyennee par blocs : le navigateur
+    # recoit au plus max_cells x max_cells valeurs en float32, quel que soit l'univers.
+    n = len(corr)
+    step = -(-n // max_cells)
+    z = corr.to_numpy(dtype=np.float32)
+    labels = [str(c) for c in corr.columns]
+    if step > 1:
+        size = -(-n // step) * step
+        padded = np.full((size, size), np.nan, dtype=np.float32)
+        padded[:n, :n] = z
+        with np.errstate(invalid="ignore"):
+            z = np.nanmean(padded.reshape(size // step, step, size // step, step), axis=(1, 3))
+        labels = [f"{labels[i]}..{labels[min(i + step, n) - 1]}" for i in range(0, n, step)]
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        colorscale="RdBu_r",
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+    ))
+    fig.update_yaxes(autorange="reversed", showticklabels=n <= 60)
+    fig.update_xaxes(showticklabels=n <= 60)
+    fig.update_layout(height=500, margin=dict(l=40, r=40, t=40, b=40))
+    return fig
+
+
+def rolling_correlation_figure(rolling: pd.DataFrame, window=None) -> go.Figure:
+    # Correlation moyenne en trait epais, paires selectionnees en traits fins.
+    fig = go.Figure()
+    for i, column in enumerate(rolling.columns):
+        fig.add_trace(line_trace(rolling[column], column, window=window, line=dict(width=3 if i == 0 else 1)))
+    fig.update_layout(
+        title="Rolling correlation",
+        height=400,
+        hovermode="x unified",
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+def rolling_mean_std(x: np.ndarray, window: int) -> tuple:
+    # Moyenne et ecart-type (ddof=1) glissants en O(n) par sommes cumulees.
+    # On centre sur la premiere valeur pour limiter les erreurs d'arrondi des grandes sommes.
+    n = len(x)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return mean, std
+    shifted = x - x[0]
+    s1 = np.concatenate(([0.0], np.cumsum(shifted)))
+    s2 = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    w1 = s1[window:] - s1[:-window]
+    w2 = s2[window:] - s2[:-window]
+    mean[window - 1:] = w1 / window + x[0]
+    std[window - 1:] = np.sqrt(np.maximum(w2 - w1 * w1 / window, 0) / (window - 1))
+    return mean, std
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    # Maximum glissant en O(n) (van Herk / Gil-Werman) : maxima cumules par blocs de `window`
+    # de gauche a droite et de droite a gauche, puis un seul np.maximum par position.
+    # Meme complexite qu'une deque monotone, mais vectorise.
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return out
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, -np.inf)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    end = np.arange(window - 1, n)
+    out[window - 1:] = np.maximum(suffix[end - window + 1], prefix[end])
+    return out
+
+
+def rolling_metrics(portfolio: pd.Series, window: int, rf: float = 0.0, periods: int = 252,
+                    confidence: float = 0.95) -> pd.DataFrame:
+    # Sharpe, volatilite, drawdown et VaR sur une fenetre glissante de `window` barres.
+    # Drawdown : par rapport au plus haut de la fenetre. VaR : quantile glissant des rendements
+    # (skiplist de pandas, O(log window) par barre).
+    values = portfolio[portfolio > 0]
+    v = values.to_numpy(dtype=float)
+    returns = np.full(len(v), np.nan)
+    returns[1:] = v[1:] / v[:-1] - 1
+
+    mean, std = rolling_mean_std(returns[1:], window)
+    mean = np.concatenate(([np.nan], mean))
+    std = np.concatenate(([np.nan], std))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(std > 1e-12, (mean - rf / periods) / std * np.sqrt(periods), np.nan)
+        drawdown = v / rolling_max(v, window) - 1
+    var = pd.Series(returns).rolling(window).quantile(1 - confidence).to_numpy()
+
+    return pd.DataFrame(
+        {"Sharpe": sharpe, "Volatility": std * np.sqrt(periods), "Drawdown": drawdown, "VaR": var},
+        index=values.index,
+    )
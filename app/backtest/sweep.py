@@ -0,0 +1,96 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest.metrics import metrics_kernel, years_between
+from single_asset.strategies.momentum import run_momentum_windows
+
+# Etat de chaque processus : la strategie et les donnees sont envoyees une seule fois par worker.
+WORKER_STATE = {}
+
+
+def init_worker(strategy, fixed: dict, rf: float, metrics=None):
+    WORKER_STATE["strategy"] = strategy
+    WORKER_STATE["fixed"] = fixed
+    WORKER_STATE["rf"] = rf
+    WORKER_STATE["metrics"] = metrics or path_metrics
+
+
+def as_values(result) -> pd.Series:
+    # Les strategies renvoient une Series, un DataFrame avec "Portefeuille" ou un tuple (DCA).
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, pd.DataFrame):
+        result = result["Portefeuille"]
+    return result
+
+
+def path_metrics(values: pd.Series, rf: float = 0.0, periods: int = 252) -> dict:
+    # Sharpe, CAGR et max drawdown d'une trajectoire (les valeurs nulles avant investissement sont ignorees).
+    values = as_values(values)
+    values = values[values > 0]
+    if len(values) < 3:
+        return {"Sharpe": np.nan, "CAGR": np.nan, "MaxDrawdown": np.nan}
+    stats = metrics_kernel(values.to_numpy(), years=years_between(values.index), rf=rf, periods=periods)
+    return {"Sharpe": stats["sharpe"], "CAGR": stats["cagr"], "MaxDrawdown": stats["max_drawdown"]}
+
+
+def run_chunk(indexed_params: list) -> list:
+    # indexed_params : paires (numero de la combinaison, parametres) ; le numero sert a remettre les lignes dans l'ordre.
+    strategy = WORKER_STATE["strategy"]
+    fixed = WORKER_STATE["fixed"]
+    rf = WORKER_STATE["rf"]
+    metrics = WORKER_STATE["metrics"]
+    rows = []
+    for index, params in indexed_params:
+        rows.append({"combo": index, **params, **metrics(strategy(**fixed, **params), rf)})
+    return rows
+
+
+def ordered_rows(rows: list) -> pd.DataFrame:
+    # Lignes dans l'ordre de la grille : on trie sur le numero de combinaison et non sur les valeurs,
+    # qui peuvent melanger les types (freq = "weekly", "month-end", 21).
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values("combo").drop(columns="combo").reset_index(drop=True)
+
+
+def parameter_grid(grid: dict) -> list:
+    # {"freq": [5, 10], "lookback": [20, 30]} -> liste de toutes les combinaisons.
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*grid.values())]
+
+
+def run_sweep(strategy, grid: dict, fixed: dict, rf: float = 0.0, max_workers: int = None,
+              metrics=None) -> pd.DataFrame:
+    # Evalue `strategy(**fixed, **params)` pour chaque combinaison de la grille sur un pool de processus
+    # et renvoie une ligne de metriques (Sharpe, CAGR, MaxDrawdown) par combinaison.
+    # metrics(result, rf) -> dict remplace path_metrics si fourni (fonction de niveau module) ;
+    # il recoit la sortie brute de la strategie (voir as_values).
+    combos = list(enumerate(parameter_grid(grid)))
+    workers = min(max_workers or os.cpu_count() or 1, len(combos))
+    if workers <= 1:
+        init_worker(strategy, fixed, rf, metrics)
+        return ordered_rows(run_chunk(combos))
+
+    # quelques paquets par worker pour equilibrer la charge sans multiplier les allers-retours
+    n_chunks = workers * 4
+    chunks = [combos[i::n_chunks] for i in range(n_chunks) if combos[i::n_chunks]]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(strategy, fixed, rf, metrics)) as pool:
+        rows = [row for chunk in pool.map(run_chunk, chunks) for row in chunk]
+    return ordered_rows(rows)
+
+
+def momentum_sweep(data: pd.Series, start, capital: float, windows, rf: float = 0.0, chunk: int = 64) -> pd.DataFrame:
+    # Sweep de la fenetre du momentum sans pool de processus : run_momentum_windows calcule un bloc
+    # de `chunk` fenetres en un passage sur les prix (memoire bornee a chunk x lignes).
+    # Une ligne de metriques par fenetre, triees comme run_sweep.
+    windows = sorted({int(window) for window in windows})
+    rows = []
+    for i in range(0, len(windows), chunk):
+        values = run_momentum_windows(data, start, capital, windows[i:i + chunk])
+        rows += [{"window": window, **path_metrics(values[window], rf)} for window in values.columns]
+    return pd.DataFrame(rows, columns=["window", "Sharpe", "CAGR", "MaxDrawdown"])
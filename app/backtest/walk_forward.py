@@ -0,0 +1,106 @@
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from single_asset.analytics.forecast import MODEL_CACHE, MODEL_LOCK, auto_arima_forecast
+
+# Etat de chaque processus : la serie complete est envoyee une seule fois par worker.
+WORKER_STATE = {}
+
+
+def init_worker(price_series: pd.Series, horizon: int, freq: str, alpha: float):
+    WORKER_STATE["series"] = price_series
+    WORKER_STATE["horizon"] = horizon
+    WORKER_STATE["freq"] = freq
+    WORKER_STATE["alpha"] = alpha
+
+
+def origin_dates(price_series: pd.Series, step: int = 5, min_history: int = 250, start=None) -> pd.DatetimeIndex:
+    # Dates de coupure : toutes les `step` barres apres `min_history` barres d'historique,
+    # a partir de `start` si fourni ; la derniere barre est exclue (rien a comparer apres).
+    origins = price_series.index[max(min_history, 2) - 1:-1:max(int(step), 1)]
+    if start is not None:
+        origins = origins[origins >= pd.Timestamp(start)]
+    return origins
+
+
+def evaluate_block(origins: list) -> list:
+    # Prevision a chaque coupure d'un bloc de dates croissantes.
+    # Dans un meme processus, fitted_model prolonge le modele precedent par update (les coupures voisines
+    # partagent le debut de la serie) et ne relance la recherche auto_arima que tous les SEARCH_EVERY ajouts.
+    # Chaque bloc a son propre nom dans le cache : il part d'une recherche sur ses seules donnees
+    # (aucun modele ajuste sur des dates posterieures, meme si le bloc tourne dans le processus appelant).
+    series = WORKER_STATE["series"]
+    horizon = WORKER_STATE["horizon"]
+    name = f"walk-forward-{uuid.uuid4().hex}"
+    rows = []
+    for origin in origins:
+        history = series.loc[:origin]
+        forecast = auto_arima_forecast(history, horizon, freq=WORKER_STATE["freq"], alpha=WORKER_STATE["alpha"],
+                                       name=name)
+        # seules les dates reellement cotees servent de verite (pas les jours interpoles)
+        actual = series.reindex(forecast.index).to_numpy(dtype=float)
+        rows.append(pd.DataFrame({
+            "origin": origin,
+            "horizon": np.arange(1, len(forecast) + 1),
+            "date": forecast.index,
+            "last": float(history.iloc[-1]),
+            "forecast": forecast["forecast"].to_numpy(),
+            "lower": forecast["lower"].to_numpy(),
+            "upper": forecast["upper"].to_numpy(),
+            "actual": actual,
+        }))
+    with MODEL_LOCK:
+        for key in [key for key in MODEL_CACHE if key[0] == name]:
+            del MODEL_CACHE[key]
+    return rows
+
+
+def horizon_summary(errors: pd.DataFrame) -> pd.DataFrame:
+    # MAE, MAPE, biais et couverture de l'intervalle par horizon, avec la MAE de la prevision naive
+    # (dernier prix connu) comme reference.
+    errors = errors.dropna(subset=["actual"])
+    error = errors["forecast"] - errors["actual"]
+    table = pd.DataFrame({
+        "horizon": errors["horizon"],
+        "abs_error": error.abs(),
+        "pct_error": (error / errors["actual"]).abs(),
+        "error": error,
+        "covered": (errors["actual"] >= errors["lower"]) & (errors["actual"] <= errors["upper"]),
+        "naive_error": (errors["last"] - errors["actual"]).abs(),
+    })
+    grouped = table.groupby("horizon")
+    return pd.DataFrame({
+        "count": grouped.size(),
+        "mae": grouped["abs_error"].mean(),
+        "mape": grouped["pct_error"].mean(),
+        "bias": grouped["error"].mean(),
+        "coverage": grouped["covered"].mean(),
+        "naive_mae": grouped["naive_error"].mean(),
+    }).reset_index()
+
+
+def walk_forward(price_series: pd.Series, horizon: int = 30, step: int = 5, min_history: int = 250, start=None,
+                 freq: str = "D", alpha: float = 0.05, max_workers: int = None) -> tuple:
+    # Backtest glissant de auto_arima_forecast : une prevision a chaque date de origin_dates.
+    # Les coupures sont decoupees en blocs contigus, un par processus, pour garder la reutilisation
+    # incrementale des modeles entre coupures voisines.
+    # Renvoie (erreurs : une ligne par coupure et horizon, resume par horizon).
+    price_series = price_series.dropna()
+    origins = list(origin_dates(price_series, step, min_history, start))
+    if not origins:
+        raise ValueError(f"Not enough history: {len(price_series)} bars for min_history={min_history}.")
+    workers = min(max_workers or os.cpu_count() or 1, len(origins))
+    if workers <= 1:
+        init_worker(price_series, horizon, freq, alpha)
+        frames = evaluate_block(origins)
+    else:
+        blocks = [list(block) for block in np.array_split(np.array(origins, dtype=object), workers)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(price_series, horizon, freq, alpha)) as pool:
+            frames = [frame for block in pool.map(evaluate_block, blocks) for frame in block]
+    errors = pd.concat(frames, ignore_index=True)
+    return errors, horizon_summary(errors)
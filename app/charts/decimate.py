@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Nombre de points maximum envoyes au navigateur par trace
+POINT_BUDGET = 2000
+
+
+def x_values(index: pd.Index) -> np.ndarray:
+    # Abscisses numeriques (secondes pour les dates) pour le calcul des aires.
+    if isinstance(index, pd.DatetimeIndex):
+        return np.asarray(index.tz_localize(None) if index.tz else index, dtype="datetime64[ns]").view(np.int64) / 1e9
+    return np.arange(len(index), dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets : dans chaque seau on garde le point qui forme le plus grand
+    # triangle avec le point retenu precedemment et la moyenne du seau suivant.
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_lo = edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    # Min et max de chaque seau (plus le premier et le dernier point) : les extremes sont conserves.
+    n = len(y)
+    n_buckets = max(1, (n_out - 2) // 2)
+    if n <= n_out:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    keep = np.concatenate(([0, n - 1], offsets + np.nanargmin(blocks, axis=1), offsets + np.nanargmax(blocks, axis=1)))
+    return np.unique(keep)
+
+
+def decimate(series: pd.Series, budget: int = POINT_BUDGET, window=None, method: str = "lttb") -> pd.Series:
+    # Reduit une serie a `budget` points au plus, sur la fenetre visible `window` (debut, fin).
+    # Plus la fenetre est etroite, plus la resolution est fine.
+    if window is not None:
+        series = series.loc[window[0]:window[1]]
+    series = series.dropna()
+    if len(series) <= budget:
+        return series
+    y = series.to_numpy(dtype=float)
+    if method == "minmax":
+        idx = minmax_indices(y, budget)
+    else:
+        idx = lttb_indices(x_values(series.index), y, budget)
+    return series.iloc[idx]
+
+
+def line_trace(series: pd.Series, name: str, budget: int = POINT_BUDGET, window=None, **kwargs) -> go.Scattergl:
+    # Trace WebGL d'une serie decimee.
+    points = decimate(series, budget, window)
+    return go.Scattergl(x=points.index, y=points.to_numpy(), mode="lines", name=name, **kwargs)
@@ -0,0 +1,14 @@
+import pandas as pd
+import streamlit as st
+
+
+def zoom_window(index: pd.Index, key: str):
+    # Curseur de periode : la fenetre choisie est re-decimee avec tout le budget de points.
+    # Renvoie None si toute la periode est affichee.
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return None
+    first, last = index[0].to_pydatetime(), index[-1].to_pydatetime()
+    chosen = st.slider("Zoom", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD", key=key)
+    if chosen[0] <= first and chosen[1] >= last:
+        return None
+    return pd.Timestamp(chosen[0]), pd.Timestamp(chosen[1])
@@ -1,7 +1,11 @@
 import streamlit as st
 import time
 import datetime as dt
-import plotly.graph_objects as go
+
+from market_data.cache import REFRESH_SECONDS, cache_stats
+from backtest.online import online_metrics
+from monitoring.timing import span, start_run, finish_run
+from monitoring.panel import session_id, timing_panel
 
 # Configuration de la page
 st.set_page_config(page_title="Finance Dashboard", layout="wide")
@@ -9,26 +13,31 @@ st.set_page_config(page_title="Finance Dashboard", layout="wide")
 st_autorefresh = st.empty()
 with st_autorefresh:
     st.markdown(
-        """
+        f"""
         <script>
-        setTimeout(function(){
+        setTimeout(function(){{
             window.location.reload();
-        }, 300000);
+        }}, {REFRESH_SECONDS * 1000});
         </script>
         """,
         unsafe_allow_html=True
     )
 
-from single_asset.ui_single_asset import run_ui_single_asset
-from portfolio.ui_portfolio import portfolio_page
 from portfolio.data.fetch_api import fetch_data_bis
 
 # Sidebar pour navigation
 st.sidebar.title("Navigation")
 page = st.sidebar.selectbox("Choose a page:", ["Home", "Strategy"])
+# durees des etapes de ce rerun (fetch, strategie, metriques, prevision, graphes)
+start_run(page, session_id())
 
 # Afficher l'heure de dernière mise à jour
 st.sidebar.info(f"Last update: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+stats = cache_stats()
+st.sidebar.caption(f"Data cache: {stats['hits']} hits / {stats['misses']} misses, {stats['size']} entries")
+show_timings = st.sidebar.checkbox("Show timings")
+# rempli a la fin du script, une fois toutes les etapes mesurees
+timings_placeholder = st.sidebar.empty()
 
 ####################"
 #Home page
@@ -75,7 +84,12 @@ if page == "Home":
     ]
 
     #On charge les data 
-    data = fetch_data_bis(selected_assets,start_date, end_date)
+    with span("fetch", "home prices"):
+        data = fetch_data_bis(selected_assets,start_date, end_date)
+    missing = [t for t in selected_assets if t not in data.columns]
+    if missing:
+        st.warning(f"No data for {', '.join(missing)}, ignored.")
+    selected_assets = list(data.columns)
 
     #Affichage du prix actuel:
     cols = st.columns(len(selected_assets))  
@@ -89,23 +103,32 @@ if page == "Home":
         color = "normal"  # st.metric gère automatiquement vert/rouge pour delta
         cols[i].metric(label=ticket, value=f"${last_price:.2f}", delta=f"{delta_pct:.2f}%")
 
-    #On affiche les asset
-    fig = go.Figure()
-    for ticket in selected_assets:
-        fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data[ticket],
-        mode="lines",
-        name=ticket
-    ))
-    fig.update_layout(
-        title="Asset price evolution",
-        xaxis_title="Date",
-        yaxis_title="Price",
-        height=500,
-        margin=dict(l=40, r=40, t=40, b=40)
-    )
-    st.plotly_chart(fig, use_container_width=True)
+        # metriques en ligne : seules les barres arrivees depuis le dernier rafraichissement sont ajoutees
+        with span("metrics", "online metrics"):
+            stats = online_metrics(("home", ticket, start_date), data[ticket].dropna())
+        cols[i].caption(
+            f"Vol {stats['volatility'] * 100:.1f}% · Sharpe {stats['sharpe']:.2f} · Max DD {stats['max_drawdown'] * 100:.1f}%"
+        )
+
+    #On affiche les asset (traces decimees, zoom re-echantillonne la periode choisie)
+    # plotly n'est importe qu'ici : le texte et les metriques s'affichent avant
+    import plotly.graph_objects as go
+    from charts.decimate import line_trace
+    from charts.zoom import zoom_window
+
+    zoom = zoom_window(data.index, "zoom_home")
+    with span("chart", "home prices"):
+        fig = go.Figure()
+        for ticket in selected_assets:
+            fig.add_trace(line_trace(data[ticket], ticket, window=zoom))
+        fig.update_layout(
+            title="Asset price evolution",
+            xaxis_title="Date",
+            yaxis_title="Price",
+            height=500,
+            margin=dict(l=40, r=40, t=40, b=40)
+        )
+        st.plotly_chart(fig, use_container_width=True)
    
 
 ##############"
@@ -123,11 +146,18 @@ else:
         ["Quant A (Single asset)", "Quant B (Portfolio)"],
         index=0 
     )
+    # chaque module n'est importe que lorsqu'il est affiche
     if strategy=="Quant A (Single asset)":
+        from single_asset.ui_single_asset import run_ui_single_asset
         run_ui_single_asset()
     else:
+        from portfolio.ui_portfolio import portfolio_page
         portfolio_page()
 
+finished = finish_run()
+if show_timings:
+    timing_panel(timings_placeholder, finished)
+
 ####################
 # Pour faire les rapports mais ca ne marche pas 
 #from ..reports.report_code import enrgistrement_prices
@@ -0,0 +1,223 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from market_data.providers import COLUMNS, get_provider, store_suffix
+
+DEFAULT_ROOT = os.environ.get(
+    "DASHBOARD_BARS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data",
+                 f"bars{store_suffix()}"),
+)
+
+# intervalle -> (duree d'une requete Yahoo, historique disponible)
+INTRADAY = {
+    "1m": (pd.Timedelta(days=7), pd.Timedelta(days=29)),
+    "5m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "1h": (pd.Timedelta(days=365), pd.Timedelta(days=729)),
+}
+
+# nombre de barres par an pour annualiser les metriques (seance US de 6h30)
+PERIODS_PER_YEAR = {"1d": 252, "1h": 252 * 7, "5m": 252 * 78, "1m": 252 * 390}
+
+FIELDS = ["ts"] + COLUMNS
+
+
+class BarStore:
+    # Barres OHLCV stockees colonne par colonne : <racine>/<intervalle>/<TICKER>/<colonne>.bin
+    # (int64 ns pour ts, float64 pour le reste). Les fichiers sont ouverts en memmap :
+    # lire des millions de barres ne copie rien, seules les pages utilisees sont chargees.
+    # Un octet deja ecrit ne change jamais : un memmap ouvert (meme apres la lecture, dans un DataFrame
+    # renvoye) verrait la modification. Les nouvelles barres sont ajoutees en fin de fichier ; si des barres
+    # stockees sont revisees ou disparaissent, toutes les colonnes sont reecrites dans des fichiers
+    # temporaires puis remplacees par os.replace (les lecteurs deja ouverts gardent l'ancien fichier).
+    # Un verrou de fichier (fcntl) par ticker est partage entre processus : lectures partagees, ecritures
+    # exclusives, donc un lecteur ne voit jamais un remplacement a moitie fait.
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self.lock = threading.RLock()
+
+    def folder(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, ticker)
+
+    @contextmanager
+    def locked(self, ticker: str, interval: str, exclusive: bool = False):
+        # Verrou partage (lecture) ou exclusif (ecriture) sur <dossier du ticker>/lock.
+        folder = self.folder(ticker, interval)
+        if not exclusive and not os.path.isdir(folder):
+            # rien a lire (un ecrivain qui cree le dossier a cet instant est coupe par read_columns)
+            yield
+            return
+        os.makedirs(folder, exist_ok=True)
+        if fcntl is None:
+            # sans fcntl (Windows) le verrou ne protege que les threads du processus
+            with self.lock:
+                yield
+            return
+        with open(os.path.join(folder, "lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_columns(self, ticker: str, interval: str) -> dict:
+        # Colonnes en memmap lecture seule (tableaux vides si le ticker n'est pas stocke), sans verrou.
+        folder = self.folder(ticker, interval)
+        arrays = {}
+        for field in FIELDS:
+            path = os.path.join(folder, f"{field}.bin")
+            dtype = np.int64 if field == "ts" else np.float64
+            if not os.path.exists(path) or os.path.getsize(path) < 8:
+                arrays[field] = np.zeros(0, dtype=dtype)
+            else:
+                arrays[field] = np.memmap(path, dtype=dtype, mode="r", shape=(os.path.getsize(path) // 8,))
+        length = min(len(values) for values in arrays.values())
+        return {field: values[:length] for field, values in arrays.items()}
+
+    def columns(self, ticker: str, interval: str) -> dict:
+        with self.locked(ticker, interval):
+            return self.read_columns(ticker, interval)
+
+    def tickers(self, interval: str) -> list:
+        # Tous les tickers stockes pour cet intervalle.
+        folder = os.path.join(self.root, interval)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(t for t in os.listdir(folder) if os.path.exists(os.path.join(folder, t, "ts.bin")))
+
+    def span(self, ticker: str, interval: str):
+        ts = self.columns(ticker, interval)["ts"]
+        if len(ts) == 0:
+            return None
+        return pd.Timestamp(ts[0]), pd.Timestamp(ts[-1])
+
+    def append(self, ticker: str, interval: str, data: pd.DataFrame):
+        if data.empty:
+            return
+        data = data.reindex(columns=COLUMNS).astype(float)
+        ts = np.asarray(data.index, dtype="datetime64[ns]").view(np.int64)
+        folder = self.folder(ticker, interval)
+        with self.locked(ticker, interval, exclusive=True):
+            stored = self.read_columns(ticker, interval)
+            keep = len(stored["ts"])
+            overlap = keep - int(np.searchsorted(stored["ts"], ts[0], side="left"))
+            if overlap and not unchanged(stored, data.iloc[:overlap], ts[:overlap]):
+                # barres revisees (derniere barre) ou inserees avant la fin : reecriture complete
+                del stored
+                self.rewrite(ticker, interval, data)
+                return
+            # barres deja stockees a l'identique : seules les suivantes sont ajoutees
+            # (fichiers de longueurs differentes apres une ecriture interrompue : on repart de la plus courte)
+            del stored
+            data, ts = data.iloc[overlap:], ts[overlap:]
+            for field in FIELDS:
+                path = os.path.join(folder, f"{field}.bin")
+                values = ts if field == "ts" else data[field].to_numpy(dtype=np.float64)
+                # r+b : on prolonge le fichier apres les barres gardees, sans jamais le raccourcir
+                with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                    f.seek(keep * 8)
+                    f.write(np.ascontiguousarray(values).tobytes())
+
+    def rewrite(self, ticker: str, interval: str, data: pd.DataFrame):
+        # Fusion complete, appelee sous le verrou exclusif : les barres stockees dans la plage de `data`
+        # sont remplacees par `data`. Toutes les colonnes sont ecrites avant le premier remplacement.
+        stored = frame_from_columns(self.read_columns(ticker, interval))
+        stored = stored[(stored.index < data.index[0]) | (stored.index > data.index[-1])]
+        merged = pd.concat([stored, data])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        folder = self.folder(ticker, interval)
+        ts = np.asarray(merged.index, dtype="datetime64[ns]").view(np.int64)
+        for field in FIELDS:
+            values = ts if field == "ts" else merged[field].to_numpy(dtype=np.float64)
+            np.ascontiguousarray(values).tofile(os.path.join(folder, f"{field}.bin.tmp"))
+        for field in FIELDS:
+            os.replace(os.path.join(folder, f"{field}.bin.tmp"), os.path.join(folder, f"{field}.bin"))
+
+    def requested_start(self, ticker: str, interval: str):
+        # Debut le plus ancien deja demande au fournisseur (None si inconnu).
+        path = os.path.join(self.folder(ticker, interval), "requested")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return pd.Timestamp(f.read().strip())
+
+    def mark_requested(self, ticker: str, interval: str, start):
+        folder = self.folder(ticker, interval)
+        with self.locked(ticker, interval, exclusive=True):
+            previous = self.requested_start(ticker, interval)
+            if previous is not None and previous <= pd.Timestamp(start):
+                return
+            tmp = os.path.join(folder, "requested.tmp")
+            with open(tmp, "w") as f:
+                f.write(pd.Timestamp(start).isoformat())
+            os.replace(tmp, os.path.join(folder, "requested"))
+
+    def frame(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        return frame_from_columns(self.columns(ticker, interval), start, end)
+
+
+def unchanged(stored: dict, data: pd.DataFrame, ts: np.ndarray) -> bool:
+    # Vrai si `data` (horodatee ts) est exactement la fin des colonnes stockees.
+    tail = {field: np.asarray(values[len(values) - len(ts):]) for field, values in stored.items()}
+    if len(tail["ts"]) != len(ts) or not np.array_equal(tail["ts"], ts):
+        return False
+    return all(np.array_equal(tail[field], data[field].to_numpy(dtype=np.float64), equal_nan=True) for field in COLUMNS)
+
+
+def frame_from_columns(arrays: dict, start=None, end=None) -> pd.DataFrame:
+    # DataFrame OHLCV sur [start, end) construit sur des vues des memmaps.
+    ts = arrays["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, pd.Timestamp(start).value, side="left"))
+    hi = len(ts) if end is None else int(np.searchsorted(ts, pd.Timestamp(end).value, side="left"))
+    index = pd.DatetimeIndex(np.asarray(ts[lo:hi]).view("datetime64[ns]"), name="Date")
+    return pd.DataFrame({field: np.asarray(arrays[field][lo:hi]) for field in COLUMNS}, index=index, copy=False)
+
+
+BAR_STORE = None
+
+
+def get_bar_store() -> BarStore:
+    global BAR_STORE
+    if BAR_STORE is None:
+        BAR_STORE = BarStore()
+    return BAR_STORE
+
+
+def load_bars(ticker: str, start, end, interval: str, provider=None) -> pd.DataFrame:
+    # Barres intraday sur [start, end) : on telecharge la tete manquante et la queue depuis la derniere
+    # barre stockee (incluse, elle peut avoir bouge), en morceaux compatibles avec les limites de Yahoo.
+    provider = provider or get_provider()
+    store = get_bar_store()
+    chunk, history = INTRADAY[interval]
+    now = pd.Timestamp.now()
+    start = max(pd.Timestamp(start), now.normalize() - history)
+    end = min(pd.Timestamp(end), now + pd.Timedelta(days=1))
+
+    span = store.span(ticker, interval)
+    if span is None:
+        ranges = [(start, end)]
+    else:
+        ranges = []
+        # la tete n'est redemandee que si elle n'a jamais ete demandee (le fournisseur peut ne rien avoir)
+        requested = store.requested_start(ticker, interval)
+        head = span[0] if requested is None else min(span[0], requested)
+        if start < head:
+            ranges.append((start, head))
+        if end > span[1]:
+            ranges.append((span[1], end))
+    for range_start, range_end in ranges:
+        while range_start < range_end:
+            piece_end = min(range_start + chunk, range_end)
+            store.append(ticker, interval, provider.download(ticker, range_start, piece_end, interval))
+            range_start = piece_end
+    store.mark_requested(ticker, interval, start)
+    return store.frame(ticker, interval, start, end)
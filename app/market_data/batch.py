@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from market_data.providers import get_provider
+
+BATCH_SIZE = 20
+MAX_WORKERS = 4
+RETRIES = 3
+BACKOFF = 0.5
+
+
+def download_group(provider, group: list, start, end, interval: str = "1d", retries: int = RETRIES,
+                   backoff: float = BACKOFF) -> tuple:
+    # Un groupe de tickers avec reessais : yfinance signale un ticker en echec par un DataFrame vide
+    # et non par une exception, donc les tickers revenus vides sont redemandes eux aussi.
+    # Renvoie (frames, errors) ; un ticker encore vide apres `retries` essais est en erreur.
+    frames, missing, error = {}, list(group), None
+    for attempt in range(retries):
+        try:
+            result, error = provider.download_many(missing, start, end, interval), None
+        except Exception as e:
+            result, error = {}, str(e)
+        for ticker in missing:
+            data = result.get(ticker)
+            if data is not None and not data.empty:
+                frames[ticker] = data
+        missing = [ticker for ticker in missing if ticker not in frames]
+        if not missing:
+            break
+        if attempt < retries - 1:
+            time.sleep(backoff * 2 ** attempt)
+    return frames, {ticker: error or "no data" for ticker in missing}
+
+
+def download_batch(tickers: list, start, end, interval: str = "1d", provider=None,
+                   batch_size: int = BATCH_SIZE, max_workers: int = MAX_WORKERS) -> tuple:
+    # Telecharge les tickers par groupes de `batch_size`, groupes en parallele sur `max_workers` threads.
+    # Renvoie (frames, errors) : un ticker en echec n'empeche pas les autres d'etre recuperes.
+    provider = provider or get_provider()
+    tickers = list(dict.fromkeys(tickers))
+    groups = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    frames, errors = {}, {}
+    if not groups:
+        return frames, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+        futures = [pool.submit(download_group, provider, group, start, end, interval) for group in groups]
+        for future in futures:
+            downloaded, failed = future.result()
+            frames.update(downloaded)
+            errors.update(failed)
+    return frames, errors
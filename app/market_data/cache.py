@@ -0,0 +1,95 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Periode de rafraichissement de l'application (secondes), utilisee aussi par main.py.
+REFRESH_SECONDS = 300
+
+
+class TTLCache:
+    # Cache LRU partage entre toutes les sessions Streamlit du processus.
+    # Les entrees expirent a la fin de la fenetre de rafraichissement en cours (alignee sur l'horloge),
+    # donc toutes les sessions renouvellent leurs donnees en meme temps.
+    # Un seul appel par cle a la fois : les sessions concurrentes attendent le premier telechargement.
+    def __init__(self, ttl: float = REFRESH_SECONDS, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def window_end(self, now: float) -> float:
+        return (now // self.ttl + 1) * self.ttl
+
+    def get_or_compute(self, key, compute):
+        while True:
+            with self.lock:
+                now = time.time()
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                event = self.pending.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self.pending[key] = threading.Event()
+                    break
+            # une autre session telecharge deja cette cle
+            event.wait()
+
+        try:
+            value = compute()
+            # on ne garde pas les reponses vides (erreur reseau, ticker inconnu)
+            if not getattr(value, "empty", False):
+                with self.lock:
+                    self.entries[key] = (self.window_end(time.time()), value)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.maxsize:
+                        self.entries.popitem(last=False)
+                        self.evictions += 1
+            return value
+        finally:
+            with self.lock:
+                del self.pending[key]
+            event.set()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries)}
+
+
+CACHE = TTLCache()
+
+
+def freeze(value):
+    # Arguments -> cle hashable (les listes de tickers deviennent des tuples).
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def cached(func):
+    # Memorise func(*args) dans CACHE ; chaque appelant recoit une copie superficielle du resultat.
+    # Les donnees ne sont pas copiees (les DataFrames sur memmap de BarStore restent sans copie) :
+    # avec le copy-on-write de pandas, modifier la copie n'atteint jamais l'objet du cache.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__module__, func.__qualname__, freeze(args), freeze(sorted(kwargs.items())))
+        value = CACHE.get_or_compute(key, lambda: func(*args, **kwargs))
+        return value.copy(deep=False) if isinstance(value, (pd.DataFrame, pd.Series)) else value
+    return wrapper
+
+
+def cache_stats() -> dict:
+    return CACHE.stats()
@@ -0,0 +1,164 @@
+import abc
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# yf.download range resultats et erreurs dans des globales du module (shared._DFS, shared._ERRORS) :
+# deux appels simultanes s'ecrasent. Tous les appels du processus passent donc par ce verrou.
+YF_LOCK = threading.Lock()
+
+
+def normalize(data: pd.DataFrame) -> pd.DataFrame:
+    # Colonnes OHLCV a un seul niveau, index de dates trie sans fuseau horaire (UTC).
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.droplevel("Ticker", axis=1) if "Ticker" in data.columns.names else data.droplevel(1, axis=1)
+    data = data.reindex(columns=COLUMNS)
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    data.index = index.rename("Date")
+    return data[~data.index.duplicated(keep="last")].sort_index()
+
+
+def empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+class Provider(abc.ABC):
+    # Interface commune : download pour un ticker, download_many pour un groupe de tickers.
+    # Par defaut un groupe est telecharge ticker par ticker.
+    # download est abstrait : un fournisseur qui ne le definit pas echoue des sa creation.
+    @abc.abstractmethod
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        ...
+
+    def download_many(self, tickers: list, start, end, interval: str = "1d") -> dict:
+        return {ticker: self.download(ticker, start, end, interval) for ticker in tickers}
+
+
+class YahooProvider(Provider):
+    # Telechargement Yahoo Finance (yfinance), fin exclusive.
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        import yfinance as yf
+        with YF_LOCK:
+            data = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+        return normalize(data)
+
+    def download_many(self, tickers: list, start, end, interval: str = "1d") -> dict:
+        # Une seule requete pour tout le groupe ; un ticker absent de la reponse revient vide.
+        # Les groupes sont serialises par YF_LOCK : le parallelisme vient des threads internes de yfinance.
+        import yfinance as yf
+        with YF_LOCK:
+            data = yf.download(
+                tickers, start=start, end=end, interval=interval, group_by="ticker", progress=False, threads=True
+            )
+        frames = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex) and ticker in data.columns.get_level_values(0):
+                frames[ticker] = normalize(data[ticker]).dropna(how="all")
+            else:
+                frames[ticker] = empty_frame()
+        return frames
+
+
+class CsvProvider(Provider):
+    # Fournisseur local : un fichier <dossier>/<TICKER>.csv (colonnes Date, Open, High, Low, Close, Volume).
+    # Remplace Yahoo dans les tests ou hors connexion.
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        path = os.path.join(self.folder, f"{ticker}.csv")
+        if not os.path.exists(path):
+            return empty_frame()
+        data = normalize(pd.read_csv(path, parse_dates=["Date"], index_col="Date"))
+        return data.loc[(data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))]
+
+
+BAR_STEPS = {"1m": 1, "5m": 5, "1h": 60}
+
+
+def fake_index(start, end, interval: str = "1d") -> pd.DatetimeIndex:
+    # Jours ouvres sur [start, end) ; en intraday, barres de la seance 14h30-21h00 UTC.
+    days = np.arange(pd.Timestamp(start).normalize().to_datetime64(), pd.Timestamp(end).to_datetime64(), np.timedelta64(1, "D"))
+    days = days[np.is_busday(days.astype("datetime64[D]"))].astype("datetime64[ns]")
+    if interval in BAR_STEPS:
+        minutes = np.arange(14 * 60 + 30, 21 * 60, BAR_STEPS[interval]).astype("timedelta64[m]")
+        days = (days[:, None] + minutes[None, :]).ravel()
+        days = days[(days >= pd.Timestamp(start).to_datetime64()) & (days < pd.Timestamp(end).to_datetime64())]
+    return pd.DatetimeIndex(days, name="Date")
+
+
+class FakeProvider(Provider):
+    # Faux fournisseur hors ligne pour mesurer le debit : marche aleatoire (journaliere ou intraday),
+    # `latency` secondes d'attente par requete et des tickers qui echouent toujours (`failing`).
+    def __init__(self, latency: float = 0.0, failing: tuple = (), seed: int = 0):
+        self.latency = latency
+        self.failing = set(failing)
+        self.seed = seed
+        self.requests = 0
+
+    def series(self, ticker: str, index: pd.DatetimeIndex) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, sum(map(ord, ticker))])
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame(
+            {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=index
+        )
+
+    def download_many(self, tickers: list, start, end, interval: str = "1d") -> dict:
+        self.requests += 1
+        time.sleep(self.latency)
+        index = fake_index(start, end, interval)
+        return {t: empty_frame() if t in self.failing else self.series(t, index) for t in tickers}
+
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        return self.download_many([ticker], start, end, interval)[ticker]
+
+
+def provider_name() -> str:
+    # Source choisie par variable d'environnement : yahoo (defaut), synthetic ou csv.
+    return os.environ.get("DASHBOARD_PROVIDER", "yahoo")
+
+
+def store_suffix() -> str:
+    # Suffixe des fichiers locaux (base de prix, barres) de la source courante : les donnees d'une
+    # autre source, ou d'une autre graine / d'un autre modele synthetique, ne sont jamais melangees.
+    name = provider_name()
+    if name == "yahoo":
+        return ""
+    if name == "synthetic":
+        return f"_synthetic_{os.environ.get('DASHBOARD_MODEL', 'gbm')}_{int(os.environ.get('DASHBOARD_SEED', 0))}"
+    return f"_{name}"
+
+
+def provider_from_env() -> Provider:
+    # DASHBOARD_PROVIDER=synthetic : donnees generees hors ligne (graine DASHBOARD_SEED,
+    # modele DASHBOARD_MODEL gbm ou regime) ; csv : fichiers du dossier DASHBOARD_CSV.
+    name = provider_name()
+    if name == "synthetic":
+        from market_data.synthetic import SyntheticProvider
+        return SyntheticProvider(seed=int(os.environ.get("DASHBOARD_SEED", 0)), model=os.environ.get("DASHBOARD_MODEL", "gbm"))
+    if name == "csv":
+        return CsvProvider(os.environ.get("DASHBOARD_CSV", "data/csv"))
+    return YahooProvider()
+
+
+PROVIDER = None
+
+
+def get_provider():
+    global PROVIDER
+    if PROVIDER is None:
+        PROVIDER = provider_from_env()
+    return PROVIDER
+
+
+def set_provider(provider):
+    # Change la source de donnees de toute l'application (par defaut celle de DASHBOARD_PROVIDER).
+    global PROVIDER
+    PROVIDER = provider
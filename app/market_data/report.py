@@ -0,0 +1,175 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from market_data.bars import INTRADAY, PERIODS_PER_YEAR, BarStore, DEFAULT_ROOT
+from market_data.store import PriceStore
+
+# Taille des paquets de tickers envoyes a chaque worker (une requete SQLite par paquet)
+CHUNK_SIZE = 250
+
+# Un ticker dont la derniere barre a plus de STALE_DAYS jours avant la fin du rapport est signale
+STALE_DAYS = 4
+
+REPORT_COLUMNS = ["Date", "Open", "Close", "Change", "Volatility", "MaxDrawdown", "Drawdown", "Observations"]
+
+# Etat de chaque processus : base journaliere, barres intraday et periode du rapport.
+WORKER_STATE = {}
+
+
+def init_worker(store_path: str, start, end, interval: str, bars_root: str = DEFAULT_ROOT):
+    WORKER_STATE["store"] = PriceStore(store_path)
+    WORKER_STATE["bars"] = BarStore(bars_root)
+    WORKER_STATE["start"] = start
+    WORKER_STATE["end"] = end
+    WORKER_STATE["interval"] = interval
+
+
+def pack(series: list) -> tuple:
+    # Series de longueurs differentes -> matrice (N x Lmax) alignee a gauche, NaN en fin de ligne.
+    lengths = np.array([len(s) for s in series], dtype=int)
+    matrix = np.full((len(series), max(lengths.max(initial=0), 1)), np.nan)
+    for i, s in enumerate(series):
+        matrix[i, :len(s)] = s
+    return matrix, lengths
+
+
+def report_kernel(close: np.ndarray, lengths: np.ndarray, periods: int = 252) -> dict:
+    # Cloture, variation du jour, volatilite annualisee, drawdown max et courant de chaque ligne,
+    # calcules en une passe sur toute la matrice.
+    rows = np.arange(len(close))
+    last = np.maximum(lengths - 1, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = close[:, 1:] / close[:, :-1] - 1
+        volatility = np.nanstd(returns, axis=1, ddof=1) * np.sqrt(periods) if close.shape[1] > 2 else np.full(len(close), np.nan)
+        peak = np.fmax.accumulate(close, axis=1)
+        drawdown = close / peak - 1
+        max_drawdown = np.nanmin(np.where(np.isnan(drawdown), np.inf, drawdown), axis=1)
+        previous = np.where(lengths > 1, close[rows, np.maximum(lengths - 2, 0)], np.nan)
+        change = close[rows, last] / previous - 1
+    max_drawdown[np.isinf(max_drawdown)] = np.nan
+    return {
+        "Close": close[rows, last],
+        "Change": change,
+        "Volatility": volatility,
+        "MaxDrawdown": max_drawdown,
+        "Drawdown": drawdown[rows, last],
+    }
+
+
+def read_chunk(tickers: list) -> dict:
+    # Barres du paquet : base SQLite en journalier, BarStore (memmap) en intraday. Rien n'est telecharge.
+    interval = WORKER_STATE["interval"]
+    start, end = WORKER_STATE["start"], WORKER_STATE["end"]
+    if interval in INTRADAY:
+        return {t: WORKER_STATE["bars"].frame(t, interval, start, end) for t in tickers}
+    return WORKER_STATE["store"].read_many(tickers, start, end, interval)
+
+
+def report_chunk(tickers: list) -> pd.DataFrame:
+    # Lecture d'un paquet de tickers puis calcul vectorise.
+    interval = WORKER_STATE["interval"]
+    frames = read_chunk(tickers)
+    frames = {t: f.dropna(subset=["Close"]) for t, f in frames.items()}
+    frames = {t: f for t, f in frames.items() if len(f)}
+    if not frames:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    names = list(frames)
+    close, lengths = pack([frames[t]["Close"].to_numpy() for t in names])
+    stats = report_kernel(close, lengths, PERIODS_PER_YEAR.get(interval, 252))
+    table = pd.DataFrame(stats, index=pd.Index(names, name="Ticker"))
+    table["Date"] = [frames[t].index[-1] for t in names]
+    table["Open"] = [frames[t]["Open"].iloc[-1] for t in names]
+    table["Observations"] = lengths
+    return table[REPORT_COLUMNS]
+
+
+def build_report(tickers: list, start, end, interval: str = "1d", store_path: str = None,
+                 max_workers: int = None, chunk_size: int = CHUNK_SIZE, bars_root: str = DEFAULT_ROOT) -> tuple:
+    # Rapport de tous les tickers, par paquets repartis sur un pool de processus.
+    # Renvoie (tableau une ligne par ticker, tickers absents de la base).
+    store_path = store_path or PriceStore().path
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        init_worker(store_path, start, end, interval, bars_root)
+        parts = [report_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(store_path, start, end, interval, bars_root)) as pool:
+            parts = list(pool.map(report_chunk, chunks))
+    parts = [p for p in parts if len(p)]
+    table = pd.concat(parts) if parts else pd.DataFrame(columns=REPORT_COLUMNS)
+    missing = [t for t in tickers if t not in table.index]
+    return table, missing
+
+
+def stale_tickers(table: pd.DataFrame, end, days: int = STALE_DAYS) -> list:
+    # Tickers dont la derniere barre est trop ancienne (base non mise a jour).
+    if table.empty:
+        return []
+    limit = pd.Timestamp(end) - pd.Timedelta(days=days)
+    return list(table.index[pd.to_datetime(table["Date"]) < limit])
+
+
+def summary_text(table: pd.DataFrame, report_date: str, missing: list, top: int = 5) -> str:
+    # Resume lisible : moyennes de l'univers et extremes du jour.
+    lines = [
+        f"Daily Report: {report_date}",
+        f"Assets: {len(table)} ({len(missing)} without data)",
+    ]
+    if len(table):
+        lines += [
+            f"Average change: {table['Change'].mean() * 100:.2f}%",
+            f"Median volatility: {table['Volatility'].median() * 100:.2f}%",
+            f"Median max drawdown: {table['MaxDrawdown'].median() * 100:.2f}%",
+        ]
+        sections = [
+            ("Top gainers", table["Change"].nlargest(top), "{:+.2f}%"),
+            ("Top losers", table["Change"].nsmallest(top), "{:+.2f}%"),
+            ("Highest volatility", table["Volatility"].nlargest(top), "{:.2f}%"),
+            ("Deepest drawdown", table["MaxDrawdown"].nsmallest(top), "{:.2f}%"),
+        ]
+        for title, values, fmt in sections:
+            lines.append("")
+            lines.append(f"{title}:")
+            lines += [f"  {ticker:<12} close {table.at[ticker, 'Close']:>12.4f}  " + fmt.format(v * 100)
+                      for ticker, v in values.items()]
+    if missing:
+        lines.append("")
+        shown = ", ".join(missing[:20]) + (" ..." if len(missing) > 20 else "")
+        lines.append(f"Without data: {shown}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(table: pd.DataFrame, missing: list, folder: str, report_date: str, fmt: str = "csv") -> tuple:
+    # Un seul fichier tableau (csv ou parquet) et un resume texte pour la journee.
+    os.makedirs(folder, exist_ok=True)
+    table_file = os.path.join(folder, f"daily_report_{report_date}.{fmt}")
+    if fmt == "parquet":
+        table.to_parquet(table_file)
+    else:
+        table.to_csv(table_file)
+    summary_file = os.path.join(folder, f"daily_report_{report_date}.txt")
+    with open(summary_file, "w") as f:
+        f.write(summary_text(table, report_date, missing))
+    return table_file, summary_file
+
+
+def run_report(tickers: list = None, start=None, end=None, interval: str = "1d", folder: str = "reports",
+               fmt: str = "csv", store_path: str = None, max_workers: int = None) -> tuple:
+    # Point d'entree du cron : par defaut tous les tickers de la base sur un an glissant.
+    # Renvoie (tableau, fichiers, duree, tickers dont la derniere barre est trop ancienne).
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize() + pd.Timedelta(days=1))
+    start = pd.Timestamp(start or end - pd.DateOffset(years=1))
+    store_path = store_path or PriceStore().path
+    if not tickers:
+        tickers = BarStore().tickers(interval) if interval in INTRADAY else PriceStore(store_path).tickers(interval)
+    began = time.perf_counter()
+    table, missing = build_report(tickers, start, end, interval, store_path, max_workers)
+    report_date = (end - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    files = write_report(table, missing, folder, report_date, fmt)
+    return table, files, time.perf_counter() - began, stale_tickers(table, end)
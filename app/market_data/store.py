@@ -0,0 +1,210 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from market_data.bars import INTRADAY, load_bars
+from market_data.batch import download_batch
+from market_data.providers import COLUMNS, get_provider, store_suffix
+
+DEFAULT_PATH = os.environ.get(
+    "DASHBOARD_STORE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data",
+                 f"prices{store_suffix()}.db"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, ts)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    PRIMARY KEY (ticker, interval)
+);
+"""
+
+
+def to_ns(date) -> int:
+    return pd.Timestamp(date).value
+
+
+def frame_from_rows(rows: list) -> pd.DataFrame:
+    # Lignes (ts, open, high, low, close, volume) -> DataFrame OHLCV indexe par date.
+    values = np.array(rows, dtype=float).reshape(len(rows), len(COLUMNS) + 1)
+    index = pd.DatetimeIndex(values[:, 0].astype(np.int64).astype("datetime64[ns]"), name="Date")
+    return pd.DataFrame(values[:, 1:], index=index, columns=COLUMNS)
+
+
+class PriceStore:
+    # Base SQLite locale des prix OHLCV par (ticker, intervalle, date).
+    # La table coverage garde la plage deja demandee au fournisseur [start, end) :
+    # un week-end ou un jour ferie sans cotation n'est donc pas re-telecharge.
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as con:
+            con.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def coverage(self, ticker: str, interval: str = "1d"):
+        with self.connect() as con:
+            row = con.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()
+        return row
+
+    def coverages(self, tickers: list, interval: str = "1d") -> dict:
+        with self.connect() as con:
+            rows = con.execute(
+                f"SELECT ticker, start, end FROM coverage WHERE interval = ? AND ticker IN ({','.join('?' * len(tickers))})",
+                (interval, *tickers),
+            ).fetchall()
+        return {ticker: (start, end) for ticker, start, end in rows}
+
+    def tickers(self, interval: str = "1d") -> list:
+        # Tous les tickers deja presents dans la base pour cet intervalle.
+        with self.connect() as con:
+            rows = con.execute("SELECT ticker FROM coverage WHERE interval = ? ORDER BY ticker", (interval,)).fetchall()
+        return [row[0] for row in rows]
+
+    def missing_ranges(self, ticker: str, start, end, interval: str = "1d", covered=()) -> list:
+        # Plages [debut, fin) a demander au fournisseur : la tete et/ou la queue manquantes.
+        start, end = to_ns(start), to_ns(end)
+        if covered == ():
+            covered = self.coverage(ticker, interval)
+        if covered is None:
+            return [(start, end)]
+        ranges = []
+        if start < covered[0]:
+            ranges.append((start, covered[0]))
+        if end > covered[1]:
+            ranges.append((covered[1], end))
+        return ranges
+
+    def write(self, ticker: str, data: pd.DataFrame, start, end, interval: str = "1d"):
+        # Enregistre les barres et etend la plage couverte.
+        # La journee en cours reste hors couverture pour etre completee au prochain appel.
+        start, end = to_ns(start), to_ns(end)
+        end = min(end, to_ns(pd.Timestamp.now().normalize()))
+        rows = data.reindex(columns=COLUMNS).astype(float)
+        records = zip(
+            [ticker] * len(rows),
+            [interval] * len(rows),
+            np.asarray(rows.index, dtype="datetime64[ns]").view(np.int64).tolist(),
+            *[rows[col].tolist() for col in COLUMNS],
+        )
+        with self.connect() as con:
+            con.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+            covered = con.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()
+            if covered is not None:
+                start, end = min(start, covered[0]), max(end, covered[1])
+            if end > start:
+                con.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)", (ticker, interval, start, end))
+
+    def read(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        return self.read_many([ticker], start, end, interval).get(ticker, frame_from_rows([]))
+
+    def read_many(self, tickers: list, start, end, interval: str = "1d") -> dict:
+        # Une seule requete pour tous les tickers, decoupee ensuite par ticker.
+        with self.connect() as con:
+            rows = con.execute(
+                "SELECT ticker, ts, open, high, low, close, volume FROM prices "
+                f"WHERE interval = ? AND ts >= ? AND ts < ? AND ticker IN ({','.join('?' * len(tickers))}) "
+                "ORDER BY ticker, ts",
+                (interval, to_ns(start), to_ns(end), *tickers),
+            ).fetchall()
+        frames = {}
+        first = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or rows[i][0] != rows[first][0]:
+                frames[rows[first][0]] = frame_from_rows([row[1:] for row in rows[first:i]])
+                first = i
+        return frames
+
+    def fetch(self, ticker: str, start, end, interval: str = "1d", provider=None) -> pd.DataFrame:
+        # Lit dans la base apres avoir demande au fournisseur uniquement les plages manquantes.
+        provider = provider or get_provider()
+        for gap_start, gap_end in self.missing_ranges(ticker, start, end, interval):
+            gap_start, gap_end = pd.Timestamp(gap_start), pd.Timestamp(gap_end)
+            data = provider.download(ticker, gap_start, gap_end, interval)
+            # yfinance renvoie un DataFrame vide en cas d'erreur : on ne marque pas la plage comme couverte
+            if not data.empty:
+                self.write(ticker, data, gap_start, gap_end, interval)
+        return self.read(ticker, start, end, interval)
+
+    def fetch_many(self, tickers: list, start, end, interval: str = "1d", provider=None) -> tuple:
+        # Version multi-tickers de fetch : les tickers qui ont les memes plages manquantes
+        # sont telecharges ensemble, par groupes concurrents (voir download_batch).
+        # Renvoie (frames, errors) sans interrompre les autres tickers en cas d'echec.
+        tickers = list(dict.fromkeys(tickers))
+        covered = self.coverages(tickers, interval)
+        gaps = {}
+        for ticker in tickers:
+            for gap in self.missing_ranges(ticker, start, end, interval, covered.get(ticker)):
+                gaps.setdefault(gap, []).append(ticker)
+
+        errors = {}
+        for (gap_start, gap_end), group in gaps.items():
+            gap_start, gap_end = pd.Timestamp(gap_start), pd.Timestamp(gap_end)
+            downloaded, failed = download_batch(group, gap_start, gap_end, interval, provider)
+            for ticker, data in downloaded.items():
+                self.write(ticker, data, gap_start, gap_end, interval)
+            errors.update(failed)
+
+        frames = self.read_many(tickers, start, end, interval)
+        for ticker in tickers:
+            if ticker in frames:
+                errors.pop(ticker, None)
+            else:
+                errors.setdefault(ticker, "no data")
+        return frames, errors
+
+
+STORE = None
+
+
+def get_store() -> PriceStore:
+    global STORE
+    if STORE is None:
+        STORE = PriceStore()
+    return STORE
+
+
+def load_prices(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+    # Point d'entree des fetchers : OHLCV de `ticker` sur [start, end) via la base locale
+    # (barres intraday dans les fichiers memmap de market_data.bars).
+    if interval in INTRADAY:
+        return load_bars(ticker, start, end, interval)
+    return get_store().fetch(ticker, start, end, interval)
+
+
+def load_prices_many(tickers: list, start, end, interval: str = "1d") -> tuple:
+    # (frames, errors) pour plusieurs tickers, telechargements groupes et concurrents.
+    if interval in INTRADAY:
+        frames, errors = {}, {}
+        for ticker in dict.fromkeys(tickers):
+            try:
+                data = load_bars(ticker, start, end, interval)
+            except Exception as e:
+                errors[ticker] = str(e)
+                continue
+            if data.empty:
+                errors[ticker] = "no data"
+            else:
+                frames[ticker] = data
+        return frames, errors
+    return get_store().fetch_many(tickers, start, end, interval)
@@ -0,0 +1,165 @@
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from market_data.providers import BAR_STEPS, COLUMNS, Provider, empty_frame, fake_index
+
+# La barre journaliere k est le k-ieme jour ouvre depuis EPOCH : un prix ne depend que de
+# (graine, ticker, date), jamais de la periode demandee ni des autres tickers.
+EPOCH = np.datetime64("1990-01-01", "D")
+SESSION_START = 14 * 60 + 30   # minutes UTC, comme fake_index
+DT = 1 / 252
+
+# Regimes du modele "regime" : (multiplicateur de volatilite, derive annuelle du marche, duree moyenne en jours)
+REGIMES = [(0.8, 0.12, 250), (2.2, -0.30, 40)]
+# Tirages de durees de regime par paquet (taille fixe : la suite ne depend pas de la longueur demandee)
+RUN_BATCH = 256
+# Le bruit open/high/low/volume est tire par blocs de CHUNK jours : seuls les blocs demandes sont generes
+CHUNK = 256
+
+
+def ticker_seed(ticker: str) -> int:
+    # Graine stable d'un ticker (hash() de Python change a chaque processus).
+    return int.from_bytes(hashlib.blake2b(ticker.encode(), digest_size=8).digest(), "little")
+
+
+class SyntheticProvider(Provider):
+    # Fournisseur hors ligne deterministe : OHLCV generes pour n'importe quel ticker et intervalle.
+    # Rendements : facteur de marche commun (beta propre a chaque ticker) + bruit specifique,
+    # GBM ("gbm") ou volatilite et derive a changement de regime de marche ("regime").
+    # Les tirages sont sequentiels depuis EPOCH : une periode plus longue prolonge la meme trajectoire.
+    # Intraday : chaque seance est un pont brownien entre l'ouverture et la cloture journalieres.
+    def __init__(self, seed: int = 0, model: str = "gbm", market_vol: float = 0.16):
+        if model not in ("gbm", "regime"):
+            raise ValueError(f"Unknown model {model}, use 'gbm' or 'regime'.")
+        self.seed = seed
+        self.model = model
+        self.market_vol = market_vol
+        self.lock = threading.Lock()
+        self.market = np.zeros(0)
+        self.scale = np.zeros(0)
+        self.requests = 0
+
+    def profile(self, ticker: str) -> dict:
+        # Caracteristiques fixes d'un ticker tirees de sa graine.
+        rng = np.random.default_rng([self.seed, ticker_seed(ticker), 0])
+        u = rng.random(5)
+        return {
+            "beta": 0.5 + u[0],
+            "vol": 0.10 + 0.30 * u[1],
+            "alpha": -0.03 + 0.09 * u[2],
+            "price": float(np.exp(np.log(5) + u[3] * np.log(100))),
+            "volume": float(np.exp(np.log(1e5) + u[4] * np.log(1e3))),
+        }
+
+    def regimes(self, n: int) -> np.ndarray:
+        # Etat de regime (0 calme, 1 stress) de chaque jour, durees geometriques alternees.
+        rng = np.random.default_rng([self.seed, 1])
+        states, total, current = [], 0, 0
+        while total < n:
+            means = np.array([REGIMES[(current + i) % 2][2] for i in range(RUN_BATCH)])
+            runs = rng.geometric(1 / means)
+            states.append(np.repeat((current + np.arange(RUN_BATCH)) % 2, runs))
+            total += int(runs.sum())
+            current = (current + RUN_BATCH) % 2
+        return np.concatenate(states)[:n]
+
+    def market_path(self, n: int) -> tuple:
+        # Facteur de marche et multiplicateur de volatilite des n premiers jours (mis en cache).
+        with self.lock:
+            if len(self.market) < n:
+                size = max(n, 2 * len(self.market))
+                z = np.random.default_rng([self.seed, 2]).standard_normal(size)
+                if self.model == "regime":
+                    state = self.regimes(size)
+                    scale = np.array([r[0] for r in REGIMES])[state]
+                    drift = np.array([r[1] for r in REGIMES])[state]
+                else:
+                    scale, drift = np.ones(size), np.full(size, 0.07)
+                self.market = self.market_vol * scale * np.sqrt(DT) * z + drift * DT
+                self.scale = scale
+            return self.market[:n], self.scale[:n]
+
+    def noise(self, ticker: str, positions: np.ndarray) -> np.ndarray:
+        # Bruit (open, high, low, volume) des jours demandes, genere bloc par bloc.
+        chunks = np.unique(positions // CHUNK)
+        block = {
+            int(c): np.random.default_rng([self.seed, ticker_seed(ticker), 3, int(c)]).standard_normal((CHUNK, 4))
+            for c in chunks
+        }
+        out = np.empty((len(positions), 4))
+        for c, values in block.items():
+            rows = positions // CHUNK == c
+            out[rows] = values[positions[rows] % CHUNK]
+        return out
+
+    def daily(self, ticker: str, positions: np.ndarray) -> dict:
+        # Barres journalieres du ticker aux jours `positions` (numeros de jour ouvre depuis EPOCH).
+        # Seul le chemin des clotures est tire depuis EPOCH (un nombre par jour).
+        n = int(positions.max()) + 1
+        p = self.profile(ticker)
+        market, scale = self.market_path(n)
+        sigma = p["vol"] * scale * np.sqrt(DT)
+        eps = np.random.default_rng([self.seed, ticker_seed(ticker), 1]).standard_normal(n)
+        returns = p["beta"] * market + sigma * eps + (p["alpha"] - 0.5 * sigma ** 2 / DT) * DT
+        log_close = np.log(p["price"]) + np.cumsum(returns)
+        close = np.exp(log_close[positions])
+        previous = np.exp(np.where(positions > 0, log_close[positions - 1], np.log(p["price"])))
+        sigma, returns = sigma[positions], returns[positions]
+        z = self.noise(ticker, positions)
+        open_ = previous * np.exp(0.2 * sigma * z[:, 0])
+        high = np.maximum(open_, close) * np.exp(0.5 * sigma * np.abs(z[:, 1]))
+        low = np.minimum(open_, close) * np.exp(-0.5 * sigma * np.abs(z[:, 2]))
+        volume = np.round(p["volume"] * np.exp(0.3 * z[:, 3] + 20 * np.abs(returns)))
+        return {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume, "sigma": sigma}
+
+    def intraday(self, ticker: str, days: np.ndarray, slots: np.ndarray, step: int) -> np.ndarray:
+        # Barres intraday : pont brownien (en log) de l'ouverture a la cloture de chaque jour.
+        # Une graine par (ticker, jour) : la seance ne depend pas de la periode demandee.
+        per_day = (21 * 60 - SESSION_START) // step
+        unique_days, where = np.unique(days, return_inverse=True)
+        bars = self.daily(ticker, unique_days)
+        k = np.arange(1, per_day + 1) / per_day
+        paths = np.empty((len(unique_days), per_day))
+        noise = np.empty((len(unique_days), per_day, 3))
+        for i, day in enumerate(unique_days):
+            z = np.random.default_rng([self.seed, ticker_seed(ticker), 2, step, int(day)]).standard_normal((per_day, 4))
+            walk = np.cumsum(z[:, 0]) * bars["sigma"][i] / np.sqrt(per_day)
+            start, end = np.log(bars["Open"][i]), np.log(bars["Close"][i])
+            paths[i] = start + k * (end - start) + walk - k * walk[-1]
+            noise[i] = z[:, 1:]
+        close = np.exp(paths)
+        open_ = np.concatenate([bars["Open"][:, None], close[:, :-1]], axis=1)
+        bar_sigma = bars["sigma"][:, None] / np.sqrt(per_day)
+        high = np.maximum(open_, close) * np.exp(0.5 * bar_sigma * np.abs(noise[:, :, 0]))
+        low = np.minimum(open_, close) * np.exp(-0.5 * bar_sigma * np.abs(noise[:, :, 1]))
+        volume = np.round(bars["Volume"][:, None] / per_day * np.exp(0.3 * noise[:, :, 2]))
+        pick = (where, slots)
+        return np.column_stack([open_[pick], high[pick], low[pick], close[pick], volume[pick]])
+
+    def download_many(self, tickers: list, start, end, interval: str = "1d") -> dict:
+        self.requests += 1
+        index = fake_index(start, end, interval)
+        days = index.to_numpy().astype("datetime64[D]")
+        keep = days >= EPOCH
+        index, days = index[keep], days[keep]
+        if len(index) == 0:
+            return {t: empty_frame() for t in tickers}
+        positions = np.busday_count(EPOCH, days)
+        if interval in BAR_STEPS:
+            minutes = (index.to_numpy() - days.astype("datetime64[ns]")).astype("timedelta64[m]").astype(int)
+            slots = (minutes - SESSION_START) // BAR_STEPS[interval]
+        frames = {}
+        for ticker in tickers:
+            if interval in BAR_STEPS:
+                values = self.intraday(ticker, positions, slots, BAR_STEPS[interval])
+            else:
+                bars = self.daily(ticker, positions)
+                values = np.column_stack([bars[column] for column in COLUMNS])
+            frames[ticker] = pd.DataFrame(values, index=index, columns=COLUMNS)
+        return frames
+
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        return self.download_many([ticker], start, end, interval)[ticker]
@@ -0,0 +1,26 @@
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from monitoring.timing import aggregates, read_log
+
+
+def session_id() -> str:
+    # Identifiant stable de la session Streamlit (pour regrouper ses reruns dans le journal).
+    if "timing_session" not in st.session_state:
+        st.session_state["timing_session"] = uuid.uuid4().hex[:12]
+    return st.session_state["timing_session"]
+
+
+def timing_panel(placeholder, spans: list):
+    # Panneau de la sidebar : durees du rerun courant puis p50/p95 par etape sur toutes les sessions.
+    with placeholder.container():
+        st.markdown("**This rerun (ms)**")
+        if spans:
+            st.dataframe(pd.DataFrame(spans)[["stage", "name", "ms"]], hide_index=True)
+        log = read_log()
+        st.markdown(f"**All sessions, last {len(log)} spans**")
+        st.dataframe(aggregates(log))
+        if st.checkbox("Detail by span", key="timing_detail"):
+            st.dataframe(aggregates(log, ("stage", "name")))
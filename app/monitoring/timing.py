@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Chaque span est ajoute a LOG_PATH (une ligne JSON) ; DASHBOARD_TIMINGS="" desactive le journal.
+LOG_PATH = os.environ.get(
+    "DASHBOARD_TIMINGS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "logs", "timings.jsonl"),
+)
+STAGES = ["fetch", "strategy", "metrics", "forecast", "chart", "rerun"]
+# Les agregats ne lisent que la fin du journal (les lignes les plus recentes)
+TAIL_BYTES = 4_000_000
+
+# Execution en cours du script : Streamlit relance chaque session dans son propre thread
+CURRENT = threading.local()
+WRITE_LOCK = threading.Lock()
+
+
+def start_run(page: str, session: str = ""):
+    # Debut d'une execution du script (un rerun) : les spans suivants lui sont rattaches.
+    CURRENT.run = {"run": uuid.uuid4().hex[:12], "session": session, "page": page,
+                   "start": time.perf_counter(), "spans": []}
+
+
+def current_spans() -> list:
+    run = getattr(CURRENT, "run", None)
+    return [] if run is None else list(run["spans"])
+
+
+def record(stage: str, name: str, seconds: float, path: str = None):
+    # Range une duree dans le rerun en cours (s'il y en a un) et l'ajoute au journal.
+    run = getattr(CURRENT, "run", None)
+    entry = {"stage": stage, "name": name, "ms": round(seconds * 1000, 3)}
+    if run is not None:
+        run["spans"].append(entry)
+    path = LOG_PATH if path is None else path
+    if not path:
+        return
+    line = {"ts": round(time.time(), 3), **entry}
+    if run is not None:
+        line.update(run=run["run"], session=run["session"], page=run["page"])
+    try:
+        with WRITE_LOCK:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a") as f:
+                f.write(json.dumps(line) + "\n")
+    except OSError:
+        # le journal ne doit jamais casser la page
+        pass
+
+
+@contextmanager
+def span(stage: str, name: str = ""):
+    # Mesure le bloc : with span("fetch", "AAPL"): ...
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, name, time.perf_counter() - start)
+
+
+def finish_run() -> list:
+    # Fin du rerun : ajoute sa duree totale et renvoie tous ses spans.
+    run = getattr(CURRENT, "run", None)
+    if run is None:
+        return []
+    record("rerun", run["page"], time.perf_counter() - run["start"])
+    CURRENT.run = None
+    return run["spans"]
+
+
+def read_log(path: str = None, tail_bytes: int = TAIL_BYTES) -> pd.DataFrame:
+    # Dernieres lignes du journal (toutes sessions et processus confondus).
+    path = LOG_PATH if path is None else path
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=["ts", "stage", "name", "ms"])
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - tail_bytes))
+        lines = f.read().splitlines()
+    if size > tail_bytes:
+        # la premiere ligne est coupee
+        lines = lines[1:]
+    rows = []
+    for line in lines:
+        try:
+            rows.append(json.loads(line))
+        except ValueError:
+            continue
+    if not rows:
+        return pd.DataFrame(columns=["ts", "stage", "name", "ms"])
+    return pd.DataFrame(rows)
+
+
+def aggregates(log: pd.DataFrame, by: tuple = ("stage",)) -> pd.DataFrame:
+    # Nombre, p50, p95 et max (ms) par etape.
+    if log.empty:
+        return pd.DataFrame(columns=["count", "p50_ms", "p95_ms", "max_ms"])
+    grouped = log.groupby(list(by))["ms"]
+    table = pd.DataFrame({
+        "count": grouped.size(),
+        "p50_ms": grouped.quantile(0.5),
+        "p95_ms": grouped.quantile(0.95),
+        "max_ms": grouped.max(),
+    })
+    if tuple(by) == ("stage",):
+        order = [s for s in STAGES if s in table.index] + [s for s in table.index if s not in STAGES]
+        table = table.loc[order]
+    return table.round(1)
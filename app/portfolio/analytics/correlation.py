@@ -1,2 +1,160 @@
-def correlation_matrix(df):
-    return df.corr()
+import numpy as np
+import pandas as pd
+
+
+def pairwise_correlation(returns: np.ndarray, block: int = 256, dtype=np.float32) -> np.ndarray:
+    # Correlation des colonnes de `returns` (T x N) sur les observations communes a chaque paire.
+    # Colonnes completes : un seul produit matriciel. Colonnes avec des trous : sommes par paire
+    # (n, sx, sy, sxx, syy, sxy) calculees par blocs de `block` colonnes en float32.
+    x = np.asarray(returns, dtype=dtype)
+    valid = np.isfinite(x)
+    n_obs, n_assets = x.shape
+    mean = np.nanmean(np.where(valid, x, np.nan), axis=0) if not valid.all() else x.mean(axis=0)
+    centered = np.where(valid, x - np.nan_to_num(mean), 0).astype(dtype)
+    corr = np.empty((n_assets, n_assets), dtype=dtype)
+
+    complete = np.flatnonzero(valid.all(axis=0))
+    holes = np.flatnonzero(~valid.all(axis=0))
+    if len(complete):
+        xc = centered[:, complete]
+        cov = xc.T @ xc
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr[np.ix_(complete, complete)] = cov / np.outer(std, std)
+
+    if len(holes):
+        mask = valid.astype(dtype)
+        squared = centered * centered
+        for b in range(0, len(holes), block):
+            cols = holes[b:b + block]
+            mb, xb, sb = mask[:, cols], centered[:, cols], squared[:, cols]
+            n = mask.T @ mb
+            sx = centered.T @ mb
+            sy = mask.T @ xb
+            sxx = squared.T @ mb
+            syy = mask.T @ sb
+            sxy = centered.T @ xb
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cov = sxy - sx * sy / n
+                var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+                c = np.where(n > 1, cov / np.sqrt(var), np.nan)
+            corr[:, cols] = c
+            corr[cols, :] = c.T
+    np.fill_diagonal(corr, 1)
+    return np.clip(corr, -1, 1)
+
+
+def pair_counts(returns: np.ndarray) -> np.ndarray:
+    valid = np.isfinite(returns).astype(np.float32)
+    return valid.T @ valid
+
+
+def shrink_correlation(corr: np.ndarray, n_obs, shrinkage="auto") -> tuple:
+    # Retrecissement vers l'identite : (1 - d) * C + d * I.
+    # "auto" : intensite de Schafer-Strimmer avec Var(r_ij) ~ (1 - r_ij^2)^2 / (n_ij - 1).
+    off = ~np.eye(len(corr), dtype=bool)
+    if shrinkage == "auto":
+        r = corr[off]
+        n = np.broadcast_to(n_obs, corr.shape)[off]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var_r = (1 - r * r) ** 2 / (n - 1)
+        shrinkage = float(np.clip(np.nansum(var_r) / np.nansum(r * r), 0, 1)) if np.nansum(r * r) > 0 else 1.0
+    shrunk = corr * (1 - shrinkage)
+    np.fill_diagonal(shrunk, 1)
+    return shrunk, shrinkage
+
+
+def cluster_order(corr: np.ndarray) -> np.ndarray:
+    # Ordre des actifs par classification hierarchique (lien moyen, distance sqrt((1 - rho) / 2)).
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    distance = np.sqrt(np.clip((1 - np.nan_to_num(corr, nan=0.0)) / 2, 0, 1)).astype(np.float64)
+    np.fill_diagonal(distance, 0)
+    return leaves_list(linkage(squareform(distance, checks=False), method="average"))
+
+
+def correlation_matrix(df, shrinkage=None, cluster: bool = False) -> pd.DataFrame:
+    # Matrice de correlation des rendements (et non des prix), donnees manquantes gerees par paire.
+    # shrinkage : None, un reel entre 0 et 1 ou "auto" ; cluster : reordonne les actifs par groupes.
+    returns = df.pct_change(fill_method=None).iloc[1:].to_numpy(dtype=np.float32)
+    corr = pairwise_correlation(returns)
+    if shrinkage is not None:
+        corr, _ = shrink_correlation(corr, pair_counts(returns), shrinkage)
+    labels = np.asarray(df.columns)
+    if cluster:
+        order = cluster_order(corr)
+        corr, labels = corr[np.ix_(order, order)], labels[order]
+    return pd.DataFrame(corr, index=labels, columns=labels)
+
+
+def window_sums(x: np.ndarray, mask: np.ndarray) -> list:
+    # Sommes par paire d'une fenetre : n, sum x_i, sum x_i^2, sum x_i x_j (x nul hors masque).
+    return [mask.T @ mask, x.T @ mask, (x * x).T @ mask, x.T @ x]
+
+
+def add_row(sums: list, x: np.ndarray, mask: np.ndarray, sign: float):
+    # Mise a jour de rang un : ajout (sign=1) ou retrait (sign=-1) d'une observation.
+    xm = sign * x
+    sums[0] += sign * np.outer(mask, mask)
+    sums[1] += np.outer(xm, mask)
+    sums[2] += np.outer(xm * x, mask)
+    sums[3] += np.outer(xm, x)
+
+
+def moments_from_sums(sums: list) -> tuple:
+    # Covariance (ddof=1) et correlation par paire a partir des sommes de la fenetre.
+    n, sx, sxx, sxy = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cross = sxy - sx * sx.T / n
+        var = (sxx - sx * sx / n) * (sxx.T - sx.T * sx.T / n)
+        cov = np.where(n > 1, cross / (n - 1), np.nan)
+        corr = np.where(n > 1, cross / np.sqrt(var), np.nan)
+    return cov, np.clip(corr, -1, 1)
+
+
+def rolling_correlation(df: pd.DataFrame, window: int, pairs=(), covariance: bool = False,
+                        refresh: int = 2000) -> pd.DataFrame:
+    # Correlation moyenne (hors diagonale) et correlations des paires demandees sur une fenetre
+    # glissante de rendements. La fenetre avance par ajout/retrait d'une ligne (O(N^2) par barre)
+    # au lieu d'un corr() complet par fenetre ; les sommes sont recalculees toutes les
+    # `refresh` barres pour eviter la derive des arrondis.
+    # covariance=True : covariances au lieu des correlations.
+    returns = df.pct_change(fill_method=None).iloc[1:]
+    r = returns.to_numpy(dtype=float)
+    valid = np.isfinite(r)
+    mask = valid.astype(float)
+    mean = np.nanmean(np.where(valid, r, np.nan), axis=0) if len(r) else np.zeros(r.shape[1])
+    x = np.where(valid, r - np.nan_to_num(mean), 0.0)
+
+    columns = list(df.columns)
+    idx = [(columns.index(a), columns.index(b)) for a, b in pairs]
+    n_rows, n_assets = x.shape
+    average = np.full(n_rows, np.nan)
+    pair_values = np.full((n_rows, len(idx)), np.nan)
+    off = ~np.eye(n_assets, dtype=bool)
+
+    sums = None
+    for t in range(window - 1, n_rows):
+        start = t - window + 1
+        if sums is None or (t - window + 1) % refresh == 0:
+            sums = window_sums(x[start:t + 1], mask[start:t + 1])
+        else:
+            add_row(sums, x[start - 1], mask[start - 1], -1.0)
+            add_row(sums, x[t], mask[t], 1.0)
+        cov, corr = moments_from_sums(sums)
+        values = cov if covariance else corr
+        finite = values[off]
+        finite = finite[np.isfinite(finite)]
+        if len(finite):
+            average[t] = finite.mean()
+        for k, (i, j) in enumerate(idx):
+            pair_values[t, k] = values[i, j]
+
+    label = "Average covariance" if covariance else "Average correlation"
+    out = pd.DataFrame({label: average}, index=returns.index)
+    for k, (a, b) in enumerate(pairs):
+        out[f"{a} / {b}"] = pair_values[:, k]
+    return out
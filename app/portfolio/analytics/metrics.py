@@ -1,93 +1,67 @@
 import pandas as pd
 import numpy as np
 
+from backtest.metrics import metrics_kernel, years_between
+
+
+def portfolio_metrics(portfolio: pd.Series, rf: float = 0.03, confidence: float = 0.95) -> dict:
+    # Toutes les metriques du portefeuille en un appel au noyau commun (fractions, VaR signee).
+    values = portfolio.dropna()
+    if len(values) < 3:
+        return metrics_kernel(np.zeros(0))
+    return metrics_kernel(values.to_numpy(), years=years_between(values.index), rf=rf, confidence=confidence)
+
 
 def return_portfolio(data : pd.DataFrame)->pd.DataFrame:
     return data.pct_change().dropna()
 
 
+def weighted_returns(returns: pd.DataFrame | pd.Series, weights: list = None) -> np.ndarray:
+    # Rendements du portefeuille : la serie telle quelle, ou rendements des actifs ponderes.
+    if isinstance(returns, pd.Series):
+        return returns.dropna().to_numpy(dtype=float)
+    if weights is None:
+        raise ValueError("Weights must be provided when returns is a DataFrame")
+    return returns.dropna().to_numpy(dtype=float) @ np.asarray(weights, dtype=float)
+
+
+# Les fonctions ci-dessous gardent leur interface et leurs unites historiques
+# mais passent toutes par le noyau commun backtest.metrics.metrics_kernel.
 def vol_portfolio(returns: pd.DataFrame | pd.Series, weights: list = None) -> float:
 # Calcule la volatilité annuelle du portefeuille (écart-type annualisé).
-    if isinstance(returns, pd.Series):
-        port_vol = returns.std() * np.sqrt(252)
-    else:
-        if weights is None:
-            raise ValueError("Weights must be provided when returns is a DataFrame")
-        weights = np.array(weights)
-        cov_matrix = returns.cov() * 252
-        port_vol = np.sqrt(weights.T @ cov_matrix @ weights)
-    
-    return port_vol
+    return float(metrics_kernel(weighted_returns(returns, weights), kind="returns")["volatility"])
 
 
 def sharpe_ratio(returns: pd.DataFrame | pd.Series, weights: list = None, rf: float = 0.03, vol: float = None) -> float:
     #Mesure le rendement ajusté du risque. Plus le Sharpe est élevé, mieux le portefeuille compense le risque pris.
-    if isinstance(returns, pd.Series):
-        ret_annual = returns.mean() * 252
-        if vol is None:
-            vol = vol_portfolio(returns)
-    else:
-        if weights is None:
-            raise ValueError("Weights must be provided when returns is a DataFrame")
-        weights = np.array(weights)
-        ret_mean_daily = returns.mean()
-        ret_annual = (ret_mean_daily @ weights) * 252
-        if vol is None:
-            vol = vol_portfolio(returns, weights)
-    
-    sharpe = (ret_annual - rf) / vol
-    return sharpe
+    stats = metrics_kernel(weighted_returns(returns, weights), rf=rf, kind="returns")
+    if vol is None:
+        return float(stats["sharpe"])
+    # volatilite imposee : sharpe * vol_noyau = rendement excedentaire annualise
+    return float(stats["sharpe"] * stats["volatility"] / vol)
 
 
 def max_draw(returns: pd.DataFrame | pd.Series, weights: list = None) -> float:
     #Calcule la perte maximale depuis un sommet historique : Indique la plus grande baisse subie par le portefeuille.
-    if isinstance(returns, pd.Series):
-        portfolio_cum = (1 + returns).cumprod()
-    else:
-        if weights is None:
-            raise ValueError("Weights must be provided when returns is a DataFrame")
-        weights = np.array(weights)
-        portfolio_cum = (1 + (returns @ weights)).cumprod()
-    
-    running_max = portfolio_cum.cummax()
-    drawdown = (portfolio_cum - running_max) / running_max
-    max_drawdown = drawdown.min()
-    
-    return max_drawdown
+    # Comme la version historique, le premier sommet est la valeur apres le premier rendement
+    # (et non le capital initial, qui compte comme sommet avec kind="returns").
+    growth = np.cumprod(1 + weighted_returns(returns, weights))
+    return float(metrics_kernel(growth)["max_drawdown"])
 
 
 def VaR(returns: pd.DataFrame | pd.Series, weights: list = None, confidence: float = 0.05) -> float:
     #Estime la perte potentielle maximale avec un certain niveau de confiance (par défaut 5% → 95% confidence).
-    if isinstance(returns, pd.Series):
-        var = returns.quantile(confidence)
-    else:
-        if weights is None:
-            raise ValueError("Weights must be provided when returns is a DataFrame")
-        weights = np.array(weights)
-        var = (returns @ weights).quantile(confidence)
-    
-    return var
+    return float(metrics_kernel(weighted_returns(returns, weights), confidence=1 - confidence, kind="returns")["var"])
 
 def total_return(portfolio: pd.Series) -> float:
     #Rendement total sur la période (en %)
-    initial_value = portfolio.iloc[0]
-    final_value = portfolio.iloc[-1]
-    total_ret = ((final_value - initial_value) / initial_value) * 100
-    return total_ret
+    return float(portfolio_metrics(portfolio)["total_return"]) * 100
 
 
 def annualized_return(portfolio: pd.Series) -> float:
     #Rendement annualisé (%), tenant compte de la durée exacte de l’investissement.
-    initial_value = portfolio.iloc[0]
-    final_value = portfolio.iloc[-1]
-    n_days = (portfolio.index[-1] - portfolio.index[0]).days
-    n_years = n_days / 365.25
-    if n_years > 0:
-        annualized_ret = (((final_value / initial_value) ** (1 / n_years)) - 1) * 100
-    else:
-        annualized_ret = 0.0
-    
-    return annualized_ret
+    annualized_ret = float(portfolio_metrics(portfolio)["cagr"])
+    return 0.0 if np.isnan(annualized_ret) else annualized_ret * 100
 
 
 def cagr(portfolio: pd.Series) -> float:
@@ -1,19 +1,25 @@
-import yfinance as yf
 from typing import Annotated
 import pandas as pd
 
+from market_data.cache import cached
+from market_data.store import load_prices_many
+
 def clean_data(data: pd.DataFrame) -> pd.Series:
     if "Ticker" in data.columns.names:  # multi-index sur les colonnes
         data = data.droplevel("Ticker", axis=1)
     # Toujours renvoyer une série
     return data["Close"].copy()
 
+@cached
 def fetch_data_bis(list_ticket : list,start:Annotated[str, "YYYY-MM-DD"],end:Annotated[str, "YYYY-MM-DD"]) -> pd.DataFrame:
-    save=pd.DataFrame()
-    for ticket in list_ticket:
-        data = yf.download(ticket, start, end)
-        if data.empty:
-            raise ValueError(f"Any data find for {ticket}.")
-        save[ticket]=clean_data(data)
+    # Les tickers sans donnees sont ignores (les autres sont conserves) ; erreur seulement si aucun ne repond.
+    frames, errors = load_prices_many(list_ticket, start, end)
+    if not frames:
+        raise ValueError(f"Any data find for {', '.join(list_ticket)}.")
+    for ticket, error in errors.items():
+        print(f"Erreur dans fetch_data_bis : {ticket} : {error}")
+    # un seul constructeur (pas d'insertion colonne par colonne) ; dates du premier ticker comme avant
+    closes = {ticket: clean_data(frames[ticket]) for ticket in list_ticket if ticket in frames}
+    index = next(iter(closes.values())).index
+    save = pd.DataFrame({ticket: close.reindex(index) for ticket, close in closes.items()}, index=index)
     return save
-
@@ -1,45 +1,50 @@
 import pandas as pd
 import numpy as np
 
-def rebalancing_proportional_returns(data: pd.DataFrame, capital: float, freq: int, lookback: int = 30) -> pd.Series:
-    selected_assets = data.columns
-    n_assets = len(selected_assets)
-    
-    value = pd.Series(0.0, index=data.index)
-    size = np.zeros(n_assets)  # nombre d'actions par actif
-    current_value = capital
-    
-    for i in range(len(data)):
-        if i % freq == 0:
-            # Calculer les poids en fonction des rendements passés
-            if i < lookback:
-                # Pas assez de données historiques -> poids égaux
-                weights = np.ones(n_assets) / n_assets
-            else:
-                # Calculer les rendements moyens sur la période lookback
-                returns_window = data.iloc[i-lookback:i].pct_change().dropna()
-                mean_returns = returns_window.mean()
-                
-                # Si tous les rendements sont négatifs ou nuls, utiliser poids égaux
-                if (mean_returns <= 0).all():
-                    weights = np.ones(n_assets) / n_assets
-                else:
-                    # Mettre à 0 les rendements négatifs (on n'investit pas dans actifs en baisse)
-                    mean_returns = mean_returns.clip(lower=0)
-                    
-                    # Calculer poids proportionnels
-                    sum_returns = mean_returns.sum()
-                    if sum_returns > 0:
-                        weights = (mean_returns / sum_returns).values
-                    else:
-                        weights = np.ones(n_assets) / n_assets
-            
-            # Réallouer le portefeuille avec les nouveaux poids
-            for j in range(n_assets):
-                size[j] = (current_value * weights[j]) / data.iloc[i, j]
-        
-        # Calculer la valeur totale du portefeuille
-        current_value = np.sum(size * data.iloc[i, :])
-        value.iloc[i] = current_value
-    
-    return value
\ No newline at end of file
+from portfolio.strategies.segments import run_segments, schedule_rows
+
+def rolling_mean_returns(prices: np.ndarray, lookback: int) -> np.ndarray:
+    # Rendement moyen de chaque actif sur la fenetre data.iloc[i-lookback:i] pour toutes les lignes i d'un coup.
+    # Une somme cumulee sur les rendements rend le cout independant de `lookback`.
+    # Comme pct_change().dropna(), une ligne avec un rendement manquant est ignoree pour tous les actifs.
+    n_rows, n_assets = prices.shape
+    returns = np.zeros((n_rows, n_assets))
+    returns[1:] = prices[1:] / prices[:-1] - 1
+    valid = np.zeros(n_rows, dtype=bool)
+    valid[1:] = np.isfinite(returns[1:]).all(axis=1)
+    returns[~valid] = 0.0
+
+    cum_returns = np.zeros((n_rows + 1, n_assets))
+    np.cumsum(returns, axis=0, out=cum_returns[1:])
+    cum_count = np.zeros(n_rows + 1)
+    np.cumsum(valid, out=cum_count[1:])
+
+    # fenetre des rendements : lignes i-lookback+1 .. i-1
+    mean = np.full((n_rows, n_assets), np.nan)
+    i = np.arange(lookback, n_rows)
+    if len(i) == 0 or lookback < 2:
+        return mean
+    count = cum_count[i] - cum_count[i - lookback + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean[i] = (cum_returns[i] - cum_returns[i - lookback + 1]) / count[:, None]
+    return mean
+
+def proportional_weights(mean_returns: np.ndarray) -> np.ndarray:
+    # Poids proportionnels aux rendements positifs, poids egaux si aucun rendement n'est positif (ou pas assez d'historique).
+    n_assets = mean_returns.shape[1]
+    positive = np.where(mean_returns > 0, mean_returns, 0.0)
+    sum_returns = positive.sum(axis=1, keepdims=True)
+    equal = np.full_like(positive, 1.0 / n_assets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(sum_returns > 0, positive / sum_returns, equal)
+
+def rebalancing_proportional_returns(data: pd.DataFrame, capital: float, freq, lookback: int = 30) -> pd.Series:
+    # Reallocation toutes les `freq` lignes (ou selon un calendrier, voir schedule_rows) avec des poids
+    # proportionnels aux rendements moyens des `lookback` dernieres lignes.
+    # Une seule matrice de rendements glissants pour tout l'historique, tous les poids calcules en une fois,
+    # puis valorisation par segments (temps constant quand `lookback` augmente).
+    prices = data.to_numpy(dtype=float)
+    rows = schedule_rows(data.index, freq)
+    mean_returns = rolling_mean_returns(prices, lookback)[rows]
+    weights = proportional_weights(mean_returns)
+    return run_segments(data, capital, rows, weights)
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+def rebalance_rows(n_rows: int, freq: int) -> np.ndarray:
+    # Indices des lignes de rebalancement (toutes les `freq` lignes, la premiere ligne toujours incluse).
+    if n_rows == 0:
+        return np.zeros(0, dtype=np.int64)
+    if freq is None or freq <= 0:
+        return np.zeros(1, dtype=np.int64)
+    return np.arange(0, n_rows, int(freq), dtype=np.int64)
+
+
+# Calendriers de rebalancement : (periode, ligne retenue dans chaque periode)
+CALENDAR_RULES = {
+    "weekly": ("week", "first"),
+    "monthly": ("month", "first"),
+    "month-end": ("month", "last"),
+    "quarter-end": ("quarter", "last"),
+    "year-end": ("year", "last"),
+}
+DAY_NS = 86_400_000_000_000
+
+
+def period_ids(index: pd.DatetimeIndex, period: str) -> np.ndarray:
+    # Numero de semaine (lundi a dimanche), de mois, de trimestre ou d'annee de chaque ligne.
+    stamps = np.asarray(index, dtype="datetime64[ns]")
+    if period == "week":
+        # le 1er janvier 1970 est un jeudi
+        return (stamps.view(np.int64) // DAY_NS + 3) // 7
+    months = stamps.astype("datetime64[M]").astype(np.int64)
+    return {"month": months, "quarter": months // 3, "year": months // 12}[period]
+
+
+def calendar_rows(index: pd.DatetimeIndex, rule: str) -> np.ndarray:
+    # Lignes de rebalancement d'un calendrier : premiere ou derniere ligne de chaque periode.
+    # La premiere ligne est toujours incluse ; la derniere periode (incomplete) n'a pas de fin.
+    if rule.lower() not in CALENDAR_RULES:
+        raise ValueError(f"Unknown schedule {rule!r}, expected one of {list(CALENDAR_RULES)}.")
+    if len(index) == 0:
+        return np.zeros(0, dtype=np.int64)
+    period, keep = CALENDAR_RULES[rule.lower()]
+    ids = period_ids(index, period)
+    change = np.flatnonzero(ids[1:] != ids[:-1])
+    rows = change + 1 if keep == "first" else change
+    return np.unique(np.concatenate(([0], rows))).astype(np.int64)
+
+
+def schedule_rows(index: pd.Index, freq) -> np.ndarray:
+    # freq entier : toutes les `freq` lignes ; texte : calendrier de CALENDAR_RULES.
+    if isinstance(freq, str):
+        return calendar_rows(index, freq)
+    return rebalance_rows(len(index), freq)
+
+
+def drift_rows(prices: np.ndarray, weights: np.ndarray, band: float, candidates: np.ndarray = None,
+               chunk: int = 32) -> np.ndarray:
+    # Rebalancement a seuil : on revient aux poids cibles a la ligne r des que l'ecart d'un poids
+    # a sa cible depasse `band` sur la ligne r-1 (la valeur reinvestie, voir segment_holdings).
+    # candidates : lignes ou un rebalancement est permis (toutes par defaut).
+    # Les poids derives ne dependent que de P[t] / P[debut du segment] : chaque segment est parcouru
+    # par blocs de taille doublee jusqu'au premier depassement, sans boucle ligne par ligne.
+    n_rows = len(prices)
+    if n_rows == 0:
+        return np.zeros(0, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+    allowed = np.ones(n_rows, dtype=bool) if candidates is None else np.zeros(n_rows, dtype=bool)
+    if candidates is not None:
+        allowed[candidates] = True
+    rows = [0]
+    start = 0
+    while True:
+        # t : ligne ou l'on mesure la derive, rebalancement possible en t+1
+        t, size, event = start, chunk, None
+        while t < n_rows - 1 and event is None:
+            stop = min(t + size, n_rows - 1)
+            held = weights * prices[t:stop] / prices[start]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                drift = np.abs(held / np.nansum(held, axis=1, keepdims=True) - weights)
+            breach = (drift > band).any(axis=1) & allowed[t + 1:stop + 1]
+            if breach.any():
+                event = t + 1 + int(np.argmax(breach))
+            t, size = stop, size * 2
+        if event is None:
+            return np.asarray(rows, dtype=np.int64)
+        rows.append(event)
+        start = event
+
+
+def segment_holdings(prices: np.ndarray, rows: np.ndarray, weights: np.ndarray, capital: float) -> np.ndarray:
+    # Nombre d'actions detenues sur chaque segment [rows[k], rows[k+1]).
+    # Comme dans la boucle historique, on reinvestit la valeur de la ligne precedant le rebalancement :
+    # V_k+1 = V_k * sum_j w_kj * P[r_k+1 - 1, j] / P[r_k, j], donc un seul cumprod suffit.
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim == 1:
+        weights = np.broadcast_to(weights, (len(rows), prices.shape[1]))
+    start_prices = prices[rows]
+    # nansum : un prix manquant compte pour 0, comme la somme pandas de la boucle historique
+    growth = np.nansum(weights[:-1] * prices[rows[1:] - 1] / start_prices[:-1], axis=1)
+    start_value = capital * np.concatenate(([1.0], np.cumprod(growth)))
+    return start_value[:, None] * weights / start_prices
+
+
+def segment_values(prices: np.ndarray, rows: np.ndarray, holdings: np.ndarray, chunk: int = 1 << 22) -> np.ndarray:
+    # Valeur du portefeuille ligne par ligne : P[t] @ holdings[segment(t)].
+    # On travaille par blocs de lignes pour ne jamais materialiser une matrice n x m complete en plus des prix.
+    n_rows, n_assets = prices.shape
+    segment_id = np.searchsorted(rows, np.arange(n_rows), side="right") - 1
+    value = np.empty(n_rows)
+    step = max(1, chunk // max(n_assets, 1))
+    for a in range(0, n_rows, step):
+        b = min(a + step, n_rows)
+        value[a:b] = np.nansum(prices[a:b] * holdings[segment_id[a:b]], axis=1)
+    return value
+
+
+def run_segments(data: pd.DataFrame, capital: float, rows: np.ndarray, weights: np.ndarray) -> pd.Series:
+    # Valorise un portefeuille rebalance aux lignes `rows` avec les poids `weights` (un vecteur ou un poids par rebalancement).
+    prices = data.to_numpy(dtype=float)
+    if len(prices) == 0:
+        return pd.Series(0.0, index=data.index)
+    holdings = segment_holdings(prices, rows, weights, capital)
+    return pd.Series(segment_values(prices, rows, holdings), index=data.index)
@@ -4,14 +4,22 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
+from streamlit_autorefresh import st_autorefresh
 
-from portfolio.analytics.correlation import correlation_matrix
+from portfolio.analytics.correlation import correlation_matrix, rolling_correlation
 from portfolio.verifcation.weight_check import check_weights
 from portfolio.strategies.rebalancing import rebalancing
 from portfolio.strategies.allocation import allocation_hold
 from portfolio.strategies.alloc_return import rebalancing_proportional_returns
 from portfolio.data.fetch_api import fetch_data_bis
-from portfolio.analytics.metrics import return_portfolio,vol_portfolio,sharpe_ratio,max_draw,VaR,total_return,annualized_return,cagr
+from backtest.online import online_strategy_metrics
+from backtest.sweep import run_sweep
+from backtest.plots import sweep_heatmap, rolling_metrics_figure, correlation_heatmap, rolling_correlation_figure
+from backtest.rolling import rolling_metrics
+from charts.decimate import line_trace
+from charts.zoom import zoom_window
+from monitoring.timing import span
+from single_asset.analytics.forecast_jobs import forecasts_in_background
 def portfolio_page():
     
 
@@ -71,7 +79,14 @@ def portfolio_page():
 
     ################################################
     #Charger les data :
-    data = fetch_data_bis(selected_assets,start_date, end_date)
+    with span("fetch", "portfolio prices"):
+        data = fetch_data_bis(selected_assets,start_date, end_date)
+    missing = [t for t in selected_assets if t not in data.columns]
+    if missing:
+        st.warning(f"No data for {', '.join(missing)}, ignored.")
+    selected_assets = list(data.columns)
+    # periode affichee sur les graphes (re-decimee a chaque zoom)
+    zoom = zoom_window(data.index, "zoom_portfolio")
 
 
     ###################################################"
@@ -95,38 +110,31 @@ def portfolio_page():
             weights.append(w)
 
         # check des poids
-        weights=check_weights(weights)
-
-        #tracer des valeurs des actifs du portefeuille
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        for ticket in selected_assets:
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data[ticket],
-                mode="lines",
-                name=ticket
-            ), secondary_y=True)
+        weights=check_weights(weights, st.warning)
 
         #charge les valeurs du portefeuille en fonction de la methode
-        portfolio = allocation_hold(data, selected_assets,weights,capital)
-     
-        # on trace l'evolution du portefeuille
-        fig.add_trace(go.Scatter(
-            x=portfolio.index,
-            y=portfolio,
-            mode="lines",
-            name="Portfolio"
-        ), secondary_y=False)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text="Asset Price", secondary_y=True)
-        fig.update_layout(
-            title="Portfolio evolution (Custom Weights)",
-            xaxis_title="Date",
-            height=500,
-            margin=dict(l=40, r=40, t=40, b=40)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("strategy", strategy):
+            portfolio = allocation_hold(data, selected_assets,weights,capital)
+        params = (tuple(weights),)
+
+        #tracer des valeurs des actifs et du portefeuille
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            for ticket in selected_assets:
+                fig.add_trace(line_trace(data[ticket], ticket, window=zoom), secondary_y=True)
+
+            # on trace l'evolution du portefeuille
+            fig.add_trace(line_trace(portfolio, "Portfolio", window=zoom), secondary_y=False)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text="Asset Price", secondary_y=True)
+            fig.update_layout(
+                title="Portfolio evolution (Custom Weights)",
+                xaxis_title="Date",
+                height=500,
+                margin=dict(l=40, r=40, t=40, b=40)
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
     if strategy=="Auto ballancing": # deuxieme strategie
         st.write("For this strategy, you must choose weights, then we readjust the weights every X amount of time (frequency) in the portfolio.")
@@ -143,57 +151,102 @@ def portfolio_page():
                 key=f"weight_{asset}"
             )
             weights.append(w)
-        weights=check_weights(weights)
+        weights=check_weights(weights, st.warning)
 
-        freq = st.number_input(
-            "Freq",
-            min_value=0,
-            value=30,   
-            max_value=int(len(data)/2)
-        ) 
+        r1,r2,r3=st.columns(3)
+        with r1:
+            schedule = st.selectbox(
+                "Rebalancing schedule",
+                ["Every X days", "Weekly", "Month-end", "Quarter-end"],
+                index=0,
+                key="schedule_rebalancing"
+            )
+        with r2:
+            if schedule == "Every X days":
+                freq = st.number_input(
+                    "Freq",
+                    min_value=0,
+                    value=30,   
+                    max_value=int(len(data)/2)
+                ) 
+            else:
+                freq = schedule.lower()
+        with r3:
+            # 0 : rebalancement a chaque date, sinon seulement si un poids derive au-dela de la bande
+            band = st.number_input(
+                "Drift band (%)",
+                min_value=0.0,
+                max_value=50.0,
+                value=0.0,
+                step=0.5,
+                help="Rebalance only when a weight is more than this many points away from its target (0 = always rebalance)."
+            ) / 100
         
-        portfolio = rebalancing(data,capital,freq,weights)
+        with span("strategy", strategy):
+            portfolio = rebalancing(data,capital,freq,weights,band)
+        params = (tuple(weights), freq, band)
 
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        for ticket in selected_assets:
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data[ticket],
-                mode="lines",
-                name=ticket
-            ), secondary_y=True)
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            for ticket in selected_assets:
+                fig.add_trace(line_trace(data[ticket], ticket, window=zoom), secondary_y=True)
 
-        fig.add_trace(go.Scatter(
-            x=portfolio.index,
-            y=portfolio,
-            mode="lines",
-            name="Portfolio"
-        ), secondary_y=False)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text=f"Asset Price", secondary_y=True)
-        fig.update_layout(
-            title="Portfolio evolution (Auto Ballancing)",
-            xaxis_title="Date",
-            height=500,
-            margin=dict(l=40, r=40, t=40, b=40)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+            fig.add_trace(line_trace(portfolio, "Portfolio", window=zoom), secondary_y=False)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text=f"Asset Price", secondary_y=True)
+            fig.update_layout(
+                title="Portfolio evolution (Auto Ballancing)",
+                xaxis_title="Date",
+                height=500,
+                margin=dict(l=40, r=40, t=40, b=40)
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        ################
+        # Sweep sur la frequence de rebalancement
+        if st.checkbox("Parameter sweep (freq)"):
+            s1,s2=st.columns(2)
+            with s1:
+                freq_range = st.slider("Freq range", min_value=1, max_value=max(2, len(data) // 2), value=(5, min(100, max(2, len(data) // 2))))
+            with s2:
+                sweep_metric = st.selectbox("Metric", ["Sharpe", "CAGR", "MaxDrawdown"], key="sweep_metric_rebalancing")
+            if st.button("Run sweep"):
+                with span("strategy", "rebalancing sweep"):
+                    table = run_sweep(
+                        rebalancing,
+                        {"freq": range(freq_range[0], freq_range[1] + 1)},
+                        {"data": data, "capital": capital, "weights": weights, "band": band},
+                        rf=rf
+                    )
+                with span("chart", "sweep heatmap"):
+                    st.plotly_chart(sweep_heatmap(table, "freq", sweep_metric), use_container_width=True)
+                st.dataframe(table)
 
    
         
     if strategy == "Auto balancing proportional returns": # troisieme strategie
         st.write("Weights are automatically recalculated every X days based on past returns.")
         
-        c1,c2=st.columns(2)
+        c1,c2,c3=st.columns(3)
         with c1 :
-            freq = st.number_input(
-                "Rebalancing frequency (days)",
-                min_value=1,
-                value=30,
-                max_value=len(data)
+            schedule = st.selectbox(
+                "Rebalancing schedule",
+                ["Every X days", "Weekly", "Month-end", "Quarter-end"],
+                index=0,
+                key="schedule_proportional"
             )
-        with c2:
+        with c2 :
+            if schedule == "Every X days":
+                freq = st.number_input(
+                    "Rebalancing frequency (days)",
+                    min_value=1,
+                    value=30,
+                    max_value=len(data)
+                )
+            else:
+                freq = schedule.lower()
+        with c3:
             lookback = st.number_input(
                 "Lookback period for returns calculation (days)",
                 min_value=5,
@@ -201,42 +254,60 @@ def portfolio_page():
                 max_value=len(data)
             )
         
-        portfolio = rebalancing_proportional_returns(data, capital, freq, lookback)
+        with span("strategy", strategy):
+            portfolio = rebalancing_proportional_returns(data, capital, freq, lookback)
+        params = (freq, lookback)
     
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        for ticket in selected_assets:
-            fig.add_trace(go.Scatter(
-                x=data.index,
-                y=data[ticket],
-                mode="lines",
-                name=ticket
-            ), secondary_y=True)
-        fig.add_trace(go.Scatter(
-            x=portfolio.index,
-            y=portfolio,
-            mode="lines",
-            name="Portfolio"
-        ), secondary_y=False)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text=f"Asset Price", secondary_y=True)
-        fig.update_layout(
-            title="Portfolio evolution (Dynamic Rebalancing)",
-            xaxis_title="Date",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            for ticket in selected_assets:
+                fig.add_trace(line_trace(data[ticket], ticket, window=zoom), secondary_y=True)
+            fig.add_trace(line_trace(portfolio, "Portfolio", window=zoom), secondary_y=False)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text=f"Asset Price", secondary_y=True)
+            fig.update_layout(
+                title="Portfolio evolution (Dynamic Rebalancing)",
+                xaxis_title="Date",
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+        ################
+        # Sweep sur la frequence et le lookback
+        if st.checkbox("Parameter sweep (freq x lookback)"):
+            s1,s2,s3=st.columns(3)
+            with s1:
+                freq_range = st.slider("Freq range", min_value=1, max_value=max(2, len(data) // 2), value=(5, min(50, max(2, len(data) // 2))))
+            with s2:
+                lookback_range = st.slider("Lookback range", min_value=5, max_value=max(6, len(data) // 2), value=(5, min(50, max(6, len(data) // 2))))
+            with s3:
+                sweep_metric = st.selectbox("Metric", ["Sharpe", "CAGR", "MaxDrawdown"], key="sweep_metric_proportional")
+            if st.button("Run sweep"):
+                with span("strategy", "proportional sweep"):
+                    table = run_sweep(
+                        rebalancing_proportional_returns,
+                        {"freq": range(freq_range[0], freq_range[1] + 1), "lookback": range(lookback_range[0], lookback_range[1] + 1)},
+                        {"data": data, "capital": capital},
+                        rf=rf
+                    )
+                with span("chart", "sweep heatmap"):
+                    st.plotly_chart(sweep_heatmap(table, "freq", sweep_metric, y="lookback"), use_container_width=True)
+                st.dataframe(table)
         
       
     #################################
     # Metrics et matrice de corrélations:
     # Calcul
-    returns = return_portfolio(portfolio)
-    vol = vol_portfolio(returns)
-    sharpe = sharpe_ratio(returns, rf=rf)
-    max_drawdown = max_draw(returns)
-    Var = VaR(returns)
-    total_ret = total_return(portfolio) 
-    annual_ret = annualized_return(portfolio)  
+    # accumulateurs en ligne : a chaque rafraichissement seules les nouvelles barres du portefeuille sont ajoutees
+    with span("metrics", "portfolio metrics"):
+        key = ("portfolio", strategy, tuple(selected_assets), start_date, capital, params)
+        stats = online_strategy_metrics(key, portfolio, rf)
+    vol = stats["volatility"]
+    sharpe = stats["sharpe"]
+    max_drawdown = stats["max_drawdown"]
+    Var = stats["var"]
+    total_ret = stats["total_return"] * 100
+    annual_ret = stats["cagr"] * 100
 
     # Affichage 
     matrix,metr=st.columns(2)
@@ -258,8 +329,29 @@ def portfolio_page():
             st.metric("VaR 95% (%)", round(Var * 100, 2))
     with matrix :
         st.markdown("**Correlation Matrix**")
-        corr_matrix=correlation_matrix(data)
-        st.dataframe(corr_matrix.style.background_gradient(cmap='coolwarm').format("{:.2f}"))
+        shrink, cluster = st.columns(2)
+        with shrink:
+            shrinkage = "auto" if st.checkbox("Shrinkage") else None
+        with cluster:
+            clustered = st.checkbox("Cluster order")
+        with span("metrics", "correlation matrix"):
+            corr_matrix=correlation_matrix(data, shrinkage=shrinkage, cluster=clustered)
+        with span("chart", "correlation heatmap"):
+            st.plotly_chart(correlation_heatmap(corr_matrix), use_container_width=True)
+
+    ################
+    # Metriques glissantes du portefeuille
+    if st.checkbox("Show rolling metrics"):
+        rolling_window = st.number_input(
+            "Rolling window (days)",
+            min_value=5,
+            max_value=max(5, len(data)),
+            value=min(63, max(5, len(data) // 4))
+        )
+        with span("metrics", "rolling metrics"):
+            rolling = rolling_metrics(portfolio, rolling_window, rf)
+        with span("chart", "rolling metrics"):
+            st.plotly_chart(rolling_metrics_figure(rolling, zoom), use_container_width=True)
             
     ################
     # Comapraison entre un actif et le portefeuille
@@ -268,26 +360,84 @@ def portfolio_page():
         selected_assets,
         index=0  
     )
-    fig = go.Figure()
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Scatter(
-        x=data.index,
-        y=data[comp_asset],
-        mode="lines",
-        name=ticket
-    ), secondary_y=True)
-    fig.add_trace(go.Scatter(
-        x=portfolio.index,
-        y=portfolio,
-        mode="lines",
-        name="Portfolio"
-    ), secondary_y=False)
-    fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-    fig.update_yaxes(title_text="Asset Price", secondary_y=True)
-    fig.update_layout(
-        title="Comparaison between "+comp_asset+" and the portfolio.",
-        xaxis_title="Date",
-        height=500,
-        margin=dict(l=40, r=40, t=40, b=40)
-    )
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    with span("chart", "comparison"):
+        fig = go.Figure()
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(line_trace(data[comp_asset], comp_asset, window=zoom), secondary_y=True)
+        fig.add_trace(line_trace(portfolio, "Portfolio", window=zoom), secondary_y=False)
+        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+        fig.update_yaxes(title_text="Asset Price", secondary_y=True)
+        fig.update_layout(
+            title="Comparaison between "+comp_asset+" and the portfolio.",
+            xaxis_title="Date",
+            height=500,
+            margin=dict(l=40, r=40, t=40, b=40)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    ################
+    # Correlation glissante entre les actifs
+    if st.checkbox("Show rolling correlation"):
+        corr_window = st.number_input(
+            "Correlation window (days)",
+            min_value=5,
+            max_value=max(5, len(data)),
+            value=min(63, max(5, len(data) // 4))
+        )
+        all_pairs = [
+            (a, b) for i, a in enumerate(data.columns) for b in data.columns[i + 1:]
+        ]
+        chosen_pairs = st.multiselect(
+            "Pairs",
+            all_pairs,
+            default=all_pairs[:3],
+            format_func=lambda pair: f"{pair[0]} / {pair[1]}"
+        )
+        show_cov = st.checkbox("Covariance instead of correlation")
+        with span("metrics", "rolling correlation"):
+            rolling_corr = rolling_correlation(data, corr_window, pairs=chosen_pairs, covariance=show_cov)
+        with span("chart", "rolling correlation"):
+            st.plotly_chart(rolling_correlation_figure(rolling_corr, zoom), use_container_width=True)
+
+    ################
+    # Previsions de tous les actifs : un calcul par (actif, horizon), en parallele en arriere-plan
+    if st.checkbox("Show asset forecasts"):
+        horizons = st.multiselect("Forecast horizons (days)", [7, 30, 90], default=[30])
+        with span("forecast", "background poll"):
+            statuses = forecasts_in_background({t: data[t].dropna() for t in selected_assets}, sorted(horizons))
+        rows = []
+        for (ticket, horizon), (forecast, running, error) in statuses.items():
+            if error is not None:
+                st.error(f"Forecast failed for {ticket} ({horizon} days): {error}")
+            last = data[ticket].dropna().iloc[-1]
+            end = forecast.iloc[-1] if forecast is not None else None
+            rows.append({
+                "Asset": ticket,
+                "Horizon (days)": horizon,
+                "Last price": last,
+                "Forecast": None if end is None else end["forecast"],
+                "Lower": None if end is None else end["lower"],
+                "Upper": None if end is None else end["upper"],
+                "Change (%)": None if end is None else (end["forecast"] / last - 1) * 100,
+                "Status": "running" if running else ("failed" if error is not None else "ready"),
+            })
+        if any(running for _, running, _ in statuses.values()):
+            st.caption("Forecasts running in background...")
+            st_autorefresh(interval=2000, key="portfolio_forecast_refresh")
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+        if horizons:
+            with span("chart", "asset forecasts"):
+                fig = go.Figure()
+                for ticket in selected_assets:
+                    fig.add_trace(line_trace(data[ticket], ticket, window=zoom))
+                    forecast = statuses[(ticket, max(horizons))][0]
+                    if forecast is not None:
+                        # la prevision est apres la fin des donnees : hors de la fenetre de zoom
+                        fig.add_trace(line_trace(forecast["forecast"], f"{ticket} forecast", line=dict(dash="dash")))
+                fig.update_layout(
+                    title=f"Asset prices and {max(horizons)}-day forecasts",
+                    xaxis_title="Date",
+                    height=500,
+                    margin=dict(l=40, r=40, t=40, b=40)
+                )
+                st.plotly_chart(fig, use_container_width=True)
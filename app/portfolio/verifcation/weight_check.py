@@ -1,7 +1,10 @@
-import streamlit as st
-def check_weights(weights):
+import warnings
+
+
+def check_weights(weights, warn=warnings.warn):
+    # `warn` recoit le message : st.warning dans l'interface, warnings.warn sinon.
     total = sum(weights)
     if total > 1:
-        st.warning("Weights normalized because sum > 1")
+        warn("Weights normalized because sum > 1")
         return [w / total for w in weights]
-    return weights
\ No newline at end of file
+    return weights
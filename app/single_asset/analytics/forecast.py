@@ -1,17 +1,33 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-from pmdarima import auto_arima
 
-def auto_arima_forecast(price_series: pd.Series,horizon: int,freq: str = "D",alpha: float = 0.05)->pd.DataFrame:
+# Modeles ajustes, partages entre les reruns et les sessions.
+# Cle : nom (ticker), debut et frequence de la serie ; on garde le modele, l'ordre, le nombre d'observations
+# et l'empreinte des valeurs deja utilisees pour savoir si la nouvelle serie les prolonge.
+MODEL_CACHE = OrderedDict()
+MODEL_CACHE_SIZE = 32
+MODEL_LOCK = threading.Lock()
 
-    series = price_series.copy()
+SEARCH_EVERY = 60          # nouvelles observations ajoutees par update avant une nouvelle recherche
+SEARCH_AFTER = 7 * 86400   # age maximal (s) d'une recherche auto_arima
+AIC_TOLERANCE = 0.10       # degradation tolere de l'AIC par observation avant nouvelle recherche
+
+
+def fingerprint(values: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(values, dtype=float).tobytes(), digest_size=16).hexdigest()
 
-    if freq is not None:
-        series = series.asfreq(freq)
-        series = series.interpolate()
 
+def search_model(series: pd.Series):
     # ARIMA sur les prix avec auto-différenciation
-    model = auto_arima(
+    # pmdarima (et statsmodels / scikit-learn) n'est importe qu'a la premiere prevision
+    from pmdarima import auto_arima
+
+    return auto_arima(
         series,
         start_p=1, start_q=1,
         max_p=3, max_q=3,
@@ -21,12 +37,81 @@ def auto_arima_forecast(price_series: pd.Series,horizon: int,freq: str = "D",alp
         stepwise=True
     )
 
+
+def new_entry(model, values: np.ndarray, searched_at: float) -> dict:
+    return {
+        "model": model,
+        "order": model.order,
+        "n_obs": len(values),
+        "fingerprint": fingerprint(values),
+        # toutes les valeurs sauf la derniere : seule la derniere barre peut etre revisee
+        "stable": fingerprint(values[:-1]),
+        "searched_at": searched_at,
+        "added": 0,
+        "aic_per_obs": model.aic() / len(values),
+    }
+
+
+def fitted_model(series: pd.Series, name: str = None):
+    # Modele pour `series` (nom : ticker, series.name par defaut) en reutilisant le cache :
+    # - meme serie : modele tel quel ;
+    # - serie prolongee : model.update avec les nouvelles barres uniquement ;
+    # - derniere barre stockee revisee (le reste identique) : reajustement avec l'ordre deja trouve ;
+    # - recherche stepwise complete dans tous les autres cas (premier appel, autre historique),
+    #   tous les SEARCH_EVERY ajouts, apres SEARCH_AFTER ou si l'AIC par observation se degrade
+    #   de plus de AIC_TOLERANCE.
+    key = (series.name if name is None else name, series.index[0], series.index.freqstr)
+    values = series.to_numpy(dtype=float)
+    now = time.time()
+    with MODEL_LOCK:
+        entry = MODEL_CACHE.get(key)
+        if entry is not None:
+            MODEL_CACHE.move_to_end(key)
+            n_obs = entry["n_obs"]
+            stale = now - entry["searched_at"] > SEARCH_AFTER or entry["added"] >= SEARCH_EVERY
+            if not stale and len(values) >= n_obs and fingerprint(values[:n_obs]) == entry["fingerprint"]:
+                if len(values) > n_obs:
+                    entry["model"].update(series.iloc[n_obs:])
+                    entry["added"] += len(values) - n_obs
+                    entry["n_obs"] = len(values)
+                    entry["fingerprint"] = fingerprint(values)
+                    entry["stable"] = fingerprint(values[:-1])
+                if entry["model"].aic() / len(values) <= entry["aic_per_obs"] * (1 + AIC_TOLERANCE) + 1e-12:
+                    return entry["model"]
+            elif not stale and len(values) >= n_obs - 1 and fingerprint(values[:n_obs - 1]) == entry["stable"]:
+                from pmdarima import ARIMA
+
+                model = ARIMA(order=entry["order"], suppress_warnings=True).fit(series)
+                MODEL_CACHE[key] = new_entry(model, values, entry["searched_at"])
+                return model
+
+    model = search_model(series)
+    with MODEL_LOCK:
+        MODEL_CACHE[key] = new_entry(model, values, now)
+        MODEL_CACHE.move_to_end(key)
+        while len(MODEL_CACHE) > MODEL_CACHE_SIZE:
+            MODEL_CACHE.popitem(last=False)
+    return model
+
+
+def auto_arima_forecast(price_series: pd.Series,horizon: int,freq: str = "D",alpha: float = 0.05,name: str = None)->pd.DataFrame:
+    # name : identifiant de la serie dans le cache de modeles (ticker), series.name par defaut
+
+    series = price_series.copy()
+
+    if freq is not None:
+        series = series.asfreq(freq)
+        series = series.interpolate()
+
+    model = fitted_model(series, name)
+
     # Prévision
-    forecast_price, conf_int = model.predict(
-        n_periods=horizon,
-        return_conf_int=True,
-        alpha=alpha
-    )
+    with MODEL_LOCK:
+        forecast_price, conf_int = model.predict(
+            n_periods=horizon,
+            return_conf_int=True,
+            alpha=alpha
+        )
 
     #Ajout d'une tendance simple pour éviter les prédictions plates
     recent_trend = (series.iloc[-1] - series.iloc[-min(20, len(series))]) / min(20, len(series))
@@ -46,4 +131,4 @@ def auto_arima_forecast(price_series: pd.Series,horizon: int,freq: str = "D",alp
             "upper": conf_int[:, 1] + trend_adjustment,
         },
         index=future_index
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from single_asset.analytics.forecast import auto_arima_forecast, fingerprint
+from monitoring.timing import record
+
+# Previsions calculees en arriere-plan dans des processus (un ajustement ARIMA par coeur).
+# Chaque ticker est toujours envoye au meme processus (EXECUTORS[hash % n], un worker chacun) :
+# le cache de modeles de ce processus sert aux mises a jour incrementales de fitted_model.
+# JOBS : calculs en cours, RESULTS : derniers resultats termines, LATEST : derniere prevision connue
+# par (ticker, horizon), affichee pendant qu'un nouveau calcul tourne. ERRORS : echecs a signaler une fois.
+EXECUTORS = [None] * (os.cpu_count() or 1)
+JOBS = {}
+RESULTS = OrderedDict()
+LATEST = {}
+ERRORS = {}
+RESULTS_SIZE = 64
+LOCK = threading.Lock()
+
+
+def worker_slot(ticker: str) -> int:
+    # Numero de processus d'un ticker, stable d'un lancement a l'autre (hash() change a chaque processus).
+    return int.from_bytes(hashlib.blake2b(ticker.encode(), digest_size=4).digest(), "little") % len(EXECUTORS)
+
+
+def get_executor(ticker: str) -> ProcessPoolExecutor:
+    slot = worker_slot(ticker)
+    if EXECUTORS[slot] is None:
+        EXECUTORS[slot] = ProcessPoolExecutor(max_workers=1)
+    return EXECUTORS[slot]
+
+
+def reset_executor(ticker: str, executor: ProcessPoolExecutor):
+    # Un pool casse (worker tue) est remplace au prochain calcul.
+    slot = worker_slot(ticker)
+    if EXECUTORS[slot] is executor:
+        EXECUTORS[slot] = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def job_key(ticker: str, series: pd.Series, horizon: int) -> tuple:
+    return (ticker, horizon, series.index[-1], fingerprint(series.to_numpy(dtype=float)))
+
+
+def collect(key: tuple, future, submitted: float, executor: ProcessPoolExecutor):
+    # Range le resultat d'un calcul termine (appele par le pool).
+    # La duree (attente + ajustement) va dans le journal des temps, hors de tout rerun.
+    record("forecast", "auto_arima (background)", time.perf_counter() - submitted)
+    with LOCK:
+        JOBS.pop(key, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            ERRORS[key] = future.exception()
+            if isinstance(future.exception(), BrokenProcessPool):
+                reset_executor(key[0], executor)
+            return
+        RESULTS[key] = future.result()
+        RESULTS.move_to_end(key)
+        LATEST[key[:2]] = RESULTS[key]
+        while len(RESULTS) > RESULTS_SIZE:
+            RESULTS.popitem(last=False)
+
+
+def submit_forecast(ticker: str, series: pd.Series, horizon: int) -> tuple:
+    # Lance (si besoin) la prevision et renvoie sa cle ; un meme calcul n'est jamais lance deux fois.
+    key = job_key(ticker, series, horizon)
+    with LOCK:
+        if key in RESULTS or key in JOBS or key in ERRORS:
+            return key
+        submitted = time.perf_counter()
+        executor = get_executor(ticker)
+        try:
+            future = executor.submit(auto_arima_forecast, series, horizon, name=ticker)
+        except BrokenProcessPool as error:
+            reset_executor(ticker, executor)
+            ERRORS[key] = error
+            return key
+        JOBS[key] = future
+    future.add_done_callback(lambda f: collect(key, f, submitted, executor))
+    return key
+
+
+def submit_forecasts(series_by_ticker: dict, horizons: list) -> list:
+    # Plusieurs tickers et horizons en parallele sur tous les coeurs.
+    return [submit_forecast(t, s, h) for t, s in series_by_ticker.items() for h in horizons]
+
+
+def forecasts_in_background(series_by_ticker: dict, horizons: list) -> dict:
+    # {(ticker, horizon): (prevision, en_cours, erreur)} pour toutes les combinaisons (page portefeuille).
+    return {key[:2]: forecast_status(key) for key in submit_forecasts(series_by_ticker, horizons)}
+
+
+def forecast_status(key: tuple) -> tuple:
+    # (prevision, en_cours, erreur) : la prevision exacte si elle est prete,
+    # sinon la derniere connue pour ce ticker et cet horizon (ou None).
+    # Un echec est renvoye une seule fois (le calcul sera relance au prochain appel).
+    with LOCK:
+        if key in RESULTS:
+            RESULTS.move_to_end(key)
+            return RESULTS[key], False, None
+        if key in ERRORS:
+            return LATEST.get(key[:2]), False, ERRORS.pop(key)
+        return LATEST.get(key[:2]), key in JOBS, None
+
+
+def forecast_in_background(ticker: str, series: pd.Series, horizon: int) -> tuple:
+    return forecast_status(submit_forecast(ticker, series, horizon))
@@ -1,90 +1,50 @@
 import numpy as np
 import pandas as pd
 
+from backtest.metrics import metrics_kernel, years_between
+
+def strategy_metrics(portfolio: pd.Series, rf: float, periods: int = 252, confidence: float = 0.95) -> dict:
+    # Toutes les metriques de la page en un appel au noyau commun, sans modifier `portfolio`.
+    # Les valeurs nulles (avant le debut de l'investissement) sont ignorees.
+    values = portfolio[portfolio > 0]
+    if len(values) < 3:
+        return metrics_kernel(np.zeros(0))
+    return metrics_kernel(values.to_numpy(), years=years_between(values.index), rf=rf, periods=periods, confidence=confidence)
+
 def portfolio_return(data : pd.DataFrame) -> pd.DataFrame:
     #data["Return"]=( data["Portefeuille"]-data["Portefeuille"].shift(1) ) / data["Portefeuille"].shift(1)
-    data["Return"]=data["Portefeuille"].pct_change()
-    return data
+    return data.assign(Return=data["Portefeuille"].pct_change())
 
-def max_drawdown(data: pd.DataFrame) -> float:
-    #Le Max Drawdown mesure la perte maximale subie par ton portefeuille depuis un sommet historique jusqu’à un creux.
-    portfolio = data["Portefeuille"]
-    portfolio = portfolio[portfolio > 0]
+def returns_metrics(data: pd.DataFrame, rf: float = 0.0, periods: int = 252, confidence: float = 0.95) -> dict:
+    # Noyau commun applique a la colonne "Return" (ajoutee par portfolio_return).
+    return metrics_kernel(data["Return"].dropna().to_numpy(dtype=float), rf=rf, periods=periods,
+                          confidence=confidence, kind="returns")
 
-    if portfolio.empty:
-        return np.nan
 
-    cum_max = portfolio.cummax()
-    drawdown = (portfolio / cum_max) - 1
-    return drawdown.min() * 100  # en % 
+# Les fonctions ci-dessous gardent leur interface et leurs unites historiques
+# mais passent toutes par metrics_kernel (via strategy_metrics ou returns_metrics).
+def max_drawdown(data: pd.DataFrame) -> float:
+    #Le Max Drawdown mesure la perte maximale subie par ton portefeuille depuis un sommet historique jusqu’à un creux.
+    return float(strategy_metrics(data["Portefeuille"].dropna(), rf=0.0)["max_drawdown"]) * 100  # en %
 
 def CAGR(data: pd.DataFrame) -> float:
     #Le CAGR indique le taux de croissance annuel moyen d’un investissement sur toute la période.
-    portfolio = data["Portefeuille"].dropna()
-    portfolio = portfolio[portfolio > 0]
-    if portfolio.empty:
-        return np.nan
-    start_date = portfolio.index[0]
-    end_date = portfolio.index[-1]
-
-    T = (end_date - start_date).days / 365.25
-
-    if T <= 0:
-        return np.nan
-
-    V_i = portfolio.iloc[0]
-    V_f = portfolio.iloc[-1]
-
-    if V_i <= 0:
-        return np.nan
-
-    return (V_f / V_i) ** (1 / T) - 1
+    return float(strategy_metrics(data["Portefeuille"].dropna(), rf=0.0)["cagr"])
 
 def sharpe(data: pd.DataFrame, rf: float, periods: int = 252) -> float:
     #Le Sharpe Ratio mesure le rendement excédentaire du portefeuille par rapport au risque total (volatilité).
-    returns=data["Return"]
-    rf_period = rf / periods
-
-    mean = returns.mean()-rf_period
-    vol = returns.std()
-
-    if vol == 0:
-        return np.nan
-
-    return (mean / vol) * np.sqrt(periods)
+    return float(returns_metrics(data, rf, periods)["sharpe"])
 
 
 def vol_annual(data: pd.DataFrame, periods: int = 252) -> float:
-    returns = data["Return"]
-    return returns.std() * np.sqrt(periods)
+    return float(returns_metrics(data, periods=periods)["volatility"])
 
 
 def sortino_ratio(data: pd.DataFrame, rf: float, periods: int = 252) -> float:
     #Le Sortino Ratio est un indicateur de performance ajustée au risque, qui pénalise uniquement les rendements négatifs.
-    returns = data["Return"].dropna() 
-
-    if returns.empty:
-        return np.nan
-    rf_period = rf / periods
-    mean_return = returns.mean() - rf_period
-    downside_returns = returns[returns < 0]
-
-    if len(downside_returns) == 0:
-        return np.inf if mean_return > 0 else np.nan
-    downside_std = downside_returns.std()
-
-    if downside_std == 0:
-        return np.nan
-    return (mean_return / downside_std) * np.sqrt(periods)
+    return float(returns_metrics(data, rf, periods)["sortino"])
 
 
 def value_at_risk(data: pd.DataFrame, confidence: float = 0.95) -> float:
     #La Value at Risk (VaR) mesure la perte maximale attendue sur un portefeuille avec un certain niveau de confiance.
-    returns = data["Return"].dropna()
-    
-    if returns.empty:
-        return np.nan
-    
-    var = returns.quantile(1 - confidence)
-    
-    return abs(var) * 100  
\ No newline at end of file
+    return abs(float(returns_metrics(data, confidence=confidence)["var"])) * 100
@@ -1,10 +1,32 @@
-import yfinance as yf
 from typing import Annotated
 import pandas as pd
 
-def fetch_data(ticket : str,start:Annotated[str, "YYYY-MM-DD"],end:Annotated[str, "YYYY-MM-DD"]) -> pd.DataFrame:
+from market_data.cache import cached
+from market_data.store import load_prices
+
+# period yfinance -> decalage depuis aujourd'hui
+PERIODS = {
+    "d": lambda n: pd.DateOffset(days=n),
+    "wk": lambda n: pd.DateOffset(weeks=n),
+    "mo": lambda n: pd.DateOffset(months=n),
+    "y": lambda n: pd.DateOffset(years=n),
+}
+
+def period_start(period: str, today: pd.Timestamp) -> pd.Timestamp:
+    if period == "max":
+        return pd.Timestamp("1900-01-01")
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    for unit, offset in PERIODS.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return today - offset(int(period[:-len(unit)]))
+    raise ValueError(f"Unknown period {period}.")
+
+@cached
+def fetch_data(ticket : str,start:Annotated[str, "YYYY-MM-DD"],end:Annotated[str, "YYYY-MM-DD"],interval: str = "1d") -> pd.DataFrame:
+    # interval : "1d" ou intraday ("1h", "5m", "1m")
     try:
-        data = yf.download(ticket, start, end)
+        data = load_prices(ticket, start, end, interval)
         if data.empty:
             raise ValueError(f"Aucune donnée trouvée pour {ticket}.")
         return data
@@ -13,13 +35,15 @@ def fetch_data(ticket : str,start:Annotated[str, "YYYY-MM-DD"],end:Annotated[str
         print(f"Erreur dans fetch_index_data : {e}")
         return pd.DataFrame()
 
+@cached
 def fetch_price(ticker: str, period: str = "1y") -> pd.DataFrame:
     try:
-        data = yf.download(ticker, period=period, progress=False)
+        today = pd.Timestamp.now().normalize()
+        data = load_prices(ticker, period_start(period, today), today + pd.Timedelta(days=1))
         if data.empty:
             raise ValueError(f"Aucune donnée trouvée pour {ticker}.")
         return data
 
     except Exception as e:
         print(f"Erreur dans fetch_index_data : {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
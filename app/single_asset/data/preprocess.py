@@ -1,5 +1,6 @@
 import pandas as pd
 
 def clean_data(data : pd.DataFrame)->pd.DataFrame:
-    data = data.droplevel("Ticker", axis=1)
+    if "Ticker" in data.columns.names:  # multi-index yfinance
+        data = data.droplevel("Ticker", axis=1)
     return data["Close"]
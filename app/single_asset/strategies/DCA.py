@@ -1,27 +1,75 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-
-
-def DCA(data : pd.Series,start:str,capital:float, freq: float,amount:float)->tuple:
-    start = pd.Timestamp(start)
-    while start not in data.index:
-        start = start + timedelta(days=1)
-
-    evolve=pd.Series(0,index=data.index)
-
-    total_invest=capital
-    size=capital/data.loc[start]
-    moyenne_achat=size*data.iloc[0]
-    for i in range(len(data)):
-        if data.index[i]>start:
-            if (data.index[i] - start).days % freq == 0:
-                new_buy_size=amount/data.iloc[i]
-                size+= new_buy_size
-                moyenne_achat+=new_buy_size*data.iloc[i]
-                total_invest+=amount
-            evolve.iloc[i]=size*data.iloc[i]
-    rendue=pd.DataFrame()
-    rendue["Portefeuille"]=evolve
-    return rendue,moyenne_achat/size,total_invest
 
-    
\ No newline at end of file
+from single_asset.strategies.dates import start_position, schedule_positions
+
+
+def dca_schedule(data: pd.Series, start: str, capital: float, freq, amount: float) -> pd.DataFrame:
+    # Suivi ligne par ligne du DCA : nombre d'actions, montant investi, prix moyen d'achat et valeur.
+    # Les dates d'achat sont placees par recherche dans l'index, les cumuls par cumsum.
+    prices = np.asarray(data, dtype=float).reshape(len(data))
+    start_pos = start_position(data.index, start)
+    buys = np.concatenate(([start_pos], schedule_positions(data.index, start_pos, freq)))
+    cash_in = np.full(len(buys), float(amount))
+    cash_in[0] = capital
+
+    cum_shares = np.cumsum(cash_in / prices[buys])
+    cum_invested = np.cumsum(cash_in)
+    last_buy = np.searchsorted(buys, np.arange(len(prices)), side="right") - 1
+    held = last_buy >= 0
+    safe = np.maximum(last_buy, 0)
+
+    shares = np.where(held, cum_shares[safe], 0.0)
+    invested = np.where(held, cum_invested[safe], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average = np.where(held, invested / shares, np.nan)
+    value = shares * prices
+    value[:start_pos + 1] = 0
+    return pd.DataFrame(
+        {"Shares": shares, "Invested": invested, "AverageCost": average, "Portefeuille": value},
+        index=data.index,
+    )
+
+
+def dca_time_weighted(schedule: pd.DataFrame) -> pd.Series:
+    # Valeur du DCA nette des versements (rendement pondere par le temps) : chaque rendement
+    # compare la valeur avant le versement du jour a la valeur de la veille, les apports ne comptent pas
+    # comme de la performance. Part de la premiere valeur non nulle, 0 avant (comme Portefeuille).
+    value = schedule["Portefeuille"].to_numpy(dtype=float)
+    flows = np.diff(schedule["Invested"].to_numpy(dtype=float), prepend=0.0)
+    held = value > 0
+    growth = np.ones(len(value))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth[1:] = np.where(held[:-1] & held[1:], (value[1:] - flows[1:]) / value[:-1], 1.0)
+    first = int(np.argmax(held)) if held.any() else 0
+    nav = np.where(held, value[first] * np.cumprod(growth), 0.0)
+    return pd.Series(nav, index=schedule.index, name="Portefeuille")
+
+
+def dca_money_weighted(schedule: pd.DataFrame) -> float:
+    # Rendement annuel pondere par les montants (TRI) : versements en sorties, valeur finale en entree.
+    from scipy.optimize import brentq
+    flows = np.diff(schedule["Invested"].to_numpy(dtype=float), prepend=0.0)
+    buys = np.flatnonzero(flows > 0)
+    if len(buys) == 0 or schedule["Portefeuille"].iloc[-1] <= 0:
+        return np.nan
+    dates = schedule.index[buys]
+    years = np.append((dates - dates[0]).days, (schedule.index[-1] - dates[0]).days) / 365.25
+    if years[-1] <= 0:
+        return np.nan
+    amounts = np.append(-flows[buys], schedule["Portefeuille"].iloc[-1])
+
+    def npv(rate):
+        return np.sum(amounts / (1 + rate) ** years)
+    try:
+        return float(brentq(npv, -0.9999, 100.0))
+    except ValueError:
+        return np.nan
+
+
+def DCA(data : pd.Series,start:str,capital:float, freq,amount:float)->tuple:
+    # freq : nombre de jours entre deux achats, ou calendrier ("weekly", "monthly").
+    schedule = dca_schedule(data, start, capital, freq, amount)
+    rendue=pd.DataFrame()
+    rendue["Portefeuille"]=schedule["Portefeuille"]
+    return rendue,schedule["AverageCost"].iloc[-1],schedule["Invested"].iloc[-1]
@@ -1,14 +1,13 @@
 import pandas as pd
-from datetime import datetime, timedelta
+
+from single_asset.strategies.dates import start_position
 
 def buy_and_hold(data : pd.DataFrame, start: str, capital : float=1000)  -> pd.DataFrame:
     evolve=pd.DataFrame()
     evolve.index=data.index
-    while start not in data.index:
-        start = start + timedelta(days=1)
-
+    start_pos = start_position(data.index, start)
 
-    size_position=capital/data.loc[start]
+    size_position=capital/data.iloc[start_pos]
     evolve["Portefeuille"]=data*size_position
-    evolve.loc[:start,"Portefeuille"]=0
+    evolve.iloc[:start_pos + 1, evolve.columns.get_loc("Portefeuille")]=0
     return evolve
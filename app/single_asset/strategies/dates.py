@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+DAY_NS = 86_400_000_000_000
+
+# calendrier -> (nombre de jours, nombre de mois) entre deux achats
+CALENDAR_SCHEDULES = {
+    "daily": (1, 0),
+    "weekly": (7, 0),
+    "biweekly": (14, 0),
+    "monthly": (0, 1),
+    "quarterly": (0, 3),
+    "yearly": (0, 12),
+}
+
+def start_position(index: pd.DatetimeIndex, start) -> int:
+    # Position de la premiere date >= start (recherche dichotomique sur l'index trie).
+    pos = int(index.searchsorted(pd.Timestamp(start), side="left"))
+    if pos >= len(index):
+        raise ValueError(f"No data on or after {start}.")
+    return pos
+
+def monthly_targets(start: pd.Timestamp, end: pd.Timestamp, step: int) -> np.ndarray:
+    # Echeances tous les `step` mois au meme jour que start (ramene au dernier jour des mois courts), en ns.
+    first = np.datetime64(start.strftime("%Y-%m"), "M")
+    n_dates = ((end.year - start.year) * 12 + end.month - start.month) // step
+    months = first + np.arange(1, n_dates + 1) * step
+    month_days = months.astype("datetime64[D]")
+    month_len = ((months + 1).astype("datetime64[D]") - month_days).astype(np.int64)
+    days = month_days + (np.minimum(start.day, month_len) - 1)
+    time_of_day = start.value - pd.Timestamp(start.date()).value
+    return days.astype("datetime64[ns]").astype(np.int64) + time_of_day
+
+def schedule_positions(index: pd.DatetimeIndex, start_pos: int, freq) -> np.ndarray:
+    # Positions des achats apres la date de depart.
+    # freq entier : tous les `freq` jours calendaires, uniquement si la date existe dans l'index.
+    # freq texte ("weekly", "monthly", ...) : premiere date disponible a partir de chaque echeance.
+    stamps = np.asarray(index, dtype="datetime64[ns]").view(np.int64)
+    start, end = stamps[start_pos], stamps[-1]
+    if isinstance(freq, str):
+        if freq.lower() not in CALENDAR_SCHEDULES:
+            raise ValueError(f"Unknown schedule {freq!r}, expected one of {list(CALENDAR_SCHEDULES)}.")
+        n_days, n_months = CALENDAR_SCHEDULES[freq.lower()]
+        if n_months:
+            targets = monthly_targets(index[start_pos], index[-1], n_months)
+        else:
+            targets = start + np.arange(1, (end - start) // (n_days * DAY_NS) + 1) * (n_days * DAY_NS)
+        pos = np.unique(np.searchsorted(stamps, targets, side="left"))
+        return pos[(pos > start_pos) & (pos < len(stamps))]
+    if freq is None or freq <= 0:
+        return np.zeros(0, dtype=np.int64)
+    step = int(freq * DAY_NS)
+    targets = start + np.arange(1, (end - start) // step + 1) * step
+    pos = np.searchsorted(stamps, targets, side="left")
+    found = pos < len(stamps)
+    pos, targets = pos[found], targets[found]
+    return pos[stamps[pos] == targets]
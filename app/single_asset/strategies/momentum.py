@@ -1,37 +1,50 @@
+import numpy as np
 import pandas as pd
 
-def run_momentum(data: pd.DataFrame, start : str, capital :float = 1000, window: int = 20) -> pd.DataFrame:
-    start = pd.Timestamp(start)
-    evolve=pd.DataFrame()
-    evolve.index=data.index
+def momentum_positions(prices: np.ndarray, first_active: int, windows: np.ndarray) -> np.ndarray:
+    # Matrice (fenetres x lignes) : True si on est investi apres la ligne i.
+    # On est investi des que le rendement sur `window` lignes est > 0, sinon on est en cash.
+    n_rows = len(prices)
+    positions = np.zeros((len(windows), n_rows), dtype=bool)
+    for k, window in enumerate(windows):
+        begin = max(first_active, int(window) + 1)
+        if begin >= n_rows:
+            continue
+        past = prices[begin - window:n_rows - window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            positions[k, begin:] = (prices[begin:] - past) / past > 0
+    return positions
 
-    buy=False
-    start_buy=None
-    size_position=0
+def momentum_values(prices: np.ndarray, first_active: int, capital: float, windows: np.ndarray) -> np.ndarray:
+    # Valeur du portefeuille pour chaque fenetre en une passe.
+    # Investi a la ligne i-1 -> la valeur suit p[i] / p[i-1], en cash -> elle ne bouge pas :
+    # la machine a etats achat/vente se reduit a un cumprod.
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    n_rows = len(prices)
+    values = np.zeros((len(windows), n_rows))
+    if n_rows == 0:
+        return values
+    positions = momentum_positions(prices, first_active, windows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = prices[1:] / prices[:-1]
+    growth = np.where(positions[:, :-1], ratio, 1.0)
+    for k, window in enumerate(windows):
+        begin = max(first_active, int(window) + 1)
+        if begin >= n_rows:
+            continue
+        values[k, begin] = capital
+        values[k, begin + 1:] = capital * np.cumprod(growth[k, begin:])
+    return values
 
-    suivi_capital=[]
-    cash=capital
+def run_momentum_windows(data: pd.Series, start: str, capital: float = 1000, windows: list = (20,)) -> pd.DataFrame:
+    # Backtest momentum pour plusieurs fenetres en un seul appel (une colonne par fenetre).
+    start = pd.Timestamp(start)
+    prices = np.asarray(data, dtype=float).reshape(len(data))
+    first_active = int(data.index.searchsorted(start, side="right"))
+    values = momentum_values(prices, first_active, capital, windows)
+    return pd.DataFrame(values.T, index=data.index, columns=list(windows))
 
-    for i in range(len(data.index)):
-        if data.index[i]>start and i>window:
-            rendement=( data.loc[data.index[i]] - data.loc[data.index[i-window]] ) / data.loc[data.index[i-window]]
-            if rendement>0:
-                if not buy:
-                    buy=True
-                    start_buy=data.index[i]
-                    size_position=cash/data.loc[start_buy]
-                    print(size_position)
-                    cash=0 
-                suivi_capital.append(size_position*data.loc[data.index[i]])
-                
-                
-            else :
-                if buy:
-                    buy=False
-                    cash=size_position*data.loc[data.index[i]]
-                    size_position=0
-                suivi_capital.append(cash)
-        else :
-            suivi_capital.append(0)
-    evolve["Portefeuille"]=suivi_capital
-    return evolve
\ No newline at end of file
+def run_momentum(data: pd.DataFrame, start : str, capital :float = 1000, window: int = 20) -> pd.DataFrame:
+    evolve = pd.DataFrame(index=data.index)
+    evolve["Portefeuille"] = run_momentum_windows(data, start, capital, [window])[window]
+    return evolve
@@ -5,14 +5,22 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import datetime as dt
 import numpy as np
+from streamlit_autorefresh import st_autorefresh
 
 from single_asset.data.fetch_api import fetch_price, fetch_data
 from single_asset.data.preprocess import clean_data
+from market_data.bars import PERIODS_PER_YEAR
 from single_asset.strategies.momentum import run_momentum
-from single_asset.strategies.DCA import DCA
+from single_asset.strategies.DCA import dca_schedule, dca_time_weighted
 from single_asset.strategies.buy_and_hold import buy_and_hold
-from single_asset.analytics.metrics import sharpe, max_drawdown, portfolio_return, CAGR, vol_annual,sortino_ratio,value_at_risk
-from single_asset.analytics.forecast import auto_arima_forecast
+from backtest.online import online_strategy_metrics
+from single_asset.analytics.forecast_jobs import forecast_in_background
+from backtest.sweep import momentum_sweep
+from backtest.plots import sweep_heatmap, rolling_metrics_figure
+from backtest.rolling import rolling_metrics
+from charts.decimate import line_trace
+from charts.zoom import zoom_window
+from monitoring.timing import span
 
 def run_ui_single_asset():
     ###################"################"
@@ -41,10 +49,22 @@ def run_ui_single_asset():
         value="AAPL"
     ).strip().upper()
     st.text("Example of tickets : Bitcoin : BTC-USD , Apple : AAPL , S&P 500 : ^GSPC , OR : GC=F.")
+    interval = st.selectbox(
+        "Interval",
+        ["1d", "1h", "5m", "1m"],
+        index=0,
+        help="Yahoo keeps about 2 years of 1h bars, 60 days of 5m bars and 30 days of 1m bars."
+    )
+    periods = PERIODS_PER_YEAR[interval]
     ########################"
     # On charge les data
-    data = fetch_data(asset,start_date, end_date)
-    price = clean_data(data)
+    with span("fetch", asset):
+        if interval == "1d":
+            data = fetch_data(asset,start_date, end_date)
+        else:
+            # en intraday on inclut les barres du jour de fin
+            data = fetch_data(asset,start_date, end_date + dt.timedelta(days=1), interval)
+        price = clean_data(data)
 
 
     ################""
@@ -64,11 +84,22 @@ def run_ui_single_asset():
                 value=30
             )
         with c1:
-            with st.spinner("Calculating forecast..."):
-                forecast_df = auto_arima_forecast(price, horizon)
+            # calcul en arriere-plan : on affiche la derniere prevision connue et on recharge jusqu'au resultat
+            daily_price = price if interval == "1d" else price.resample("D").last().dropna()
+            with span("forecast", "background poll"):
+                forecast_df, running, error = forecast_in_background(asset, daily_price, horizon)
+            if error is not None:
+                st.error(f"Forecast failed: {error}")
+            if running:
+                st.caption("Forecast running in background...")
+                st_autorefresh(interval=2000, key="forecast_refresh")
+            if forecast_df is not None:
                 price_extended = pd.concat([price, forecast_df["forecast"]])
 
 
+    # periode affichee sur les graphes (re-decimee a chaque zoom)
+    zoom = zoom_window(price_extended.index, "zoom_single")
+
     ########################
     # Choix de la strategie et paramatre
 
@@ -109,51 +140,39 @@ def run_ui_single_asset():
     if strategy == "Buy & Hold": #premier strategie
         
         #on charge les valeurs du portefeuille
-        result = buy_and_hold(price_extended,start_ts,capital)
+        with span("strategy", strategy):
+            result = buy_and_hold(price_extended,start_ts,capital)
 
         #on trace le graphe asset et portefeuille
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Scatter(
-            x=result.index,
-            y=result["Portefeuille"],
-            mode="lines",
-            name="Investement Strategy"
-        ), secondary_y=False)
-        fig.add_trace(go.Scatter(
-            x=data.index,
-            y=price,
-            mode="lines",
-            name=asset
-        ), secondary_y=True)
-        if show_forecast: # on rajoute la prediction si elle est selectionner
-            fig.add_trace(go.Scatter(
-                x=forecast_df["forecast"].index,
-                y=forecast_df["forecast"],
-                mode="lines",
-                name="Prediction"
-            ), secondary_y=True)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
-        fig.update_layout(
-            title="Investement evolution",
-            xaxis_title="Date",
-            height=500  
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(line_trace(result["Portefeuille"], "Investement Strategy", window=zoom), secondary_y=False)
+            fig.add_trace(line_trace(price, asset, window=zoom), secondary_y=True)
+            if forecast_df is not None: # on rajoute la prediction si elle est disponible
+                fig.add_trace(line_trace(forecast_df["forecast"], "Prediction", window=zoom), secondary_y=True)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
+            fig.update_layout(
+                title="Investement evolution",
+                xaxis_title="Date",
+                height=500  
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
         ################
         #Metrics
         # calcul
-        result=result[result["Portefeuille"]!=0]
-        result=portfolio_return(result)
-        result.dropna(inplace=True)
-        max_drawdow=max_drawdown(result)
-        cagr=CAGR(result)
-        sharpe_ratio=sharpe(result,rf)
-        sortino_val = sortino_ratio(result, rf=rf)
-        vol = vol_annual(result) * 100  
-        var_95 = value_at_risk(result, confidence=0.95) 
+        with span("metrics", strategy):
+            # accumulateurs en ligne : seules les barres apparues depuis le dernier rafraichissement sont ajoutees
+            key = ("single", asset, interval, strategy, start_ts, capital)
+            stats = online_strategy_metrics(key, result["Portefeuille"], rf, periods)
+        max_drawdow = stats["max_drawdown"] * 100
+        cagr = stats["cagr"] * 100
+        sharpe_ratio = stats["sharpe"]
+        sortino_val = stats["sortino"]
+        vol = stats["volatility"] * 100
+        var_95 = abs(stats["var"]) * 100
 
         #affichage
         c1,c2,c3,c4,c5,c6=st.columns(6)
@@ -179,47 +198,34 @@ def run_ui_single_asset():
             value=20,
         )
 
-        result = run_momentum(price_extended,start_ts,capital,window)
+        with span("strategy", strategy):
+            result = run_momentum(price_extended,start_ts,capital,window)
 
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Scatter(
-            x=result.index,
-            y=result["Portefeuille"],
-            mode="lines",
-            name="Investement Strategy"
-        ), secondary_y=False)
-        fig.add_trace(go.Scatter(
-            x=data.index,
-            y=price,
-            mode="lines",
-            name=asset,
-        ), secondary_y=True)
-        if show_forecast:
-            fig.add_trace(go.Scatter(
-                x=forecast_df["forecast"].index,
-                y=forecast_df["forecast"],
-                mode="lines",
-                name="Prediction",
-            ), secondary_y=True)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
-        fig.update_layout(
-            title="Investemment evolution",
-            xaxis_title="Date",
-            height=500
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(line_trace(result["Portefeuille"], "Investement Strategy", window=zoom), secondary_y=False)
+            fig.add_trace(line_trace(price, asset, window=zoom), secondary_y=True)
+            if forecast_df is not None:
+                fig.add_trace(line_trace(forecast_df["forecast"], "Prediction", window=zoom), secondary_y=True)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
+            fig.update_layout(
+                title="Investemment evolution",
+                xaxis_title="Date",
+                height=500
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
-        result=result[result["Portefeuille"]!=0]
-        result=portfolio_return(result)
-        result.dropna(inplace=True)
-        max_drawdow=max_drawdown(result)
-        cagr=CAGR(result)
-        sharpe_ratio=sharpe(result,rf)
-        sortino_val = sortino_ratio(result, rf=rf)
-        vol = vol_annual(result) * 100
-        var_95 = value_at_risk(result, confidence=0.95) 
+        with span("metrics", strategy):
+            key = ("single", asset, interval, strategy, start_ts, capital, window)
+            stats = online_strategy_metrics(key, result["Portefeuille"], rf, periods)
+        max_drawdow = stats["max_drawdown"] * 100
+        cagr = stats["cagr"] * 100
+        sharpe_ratio = stats["sharpe"]
+        sortino_val = stats["sortino"]
+        vol = stats["volatility"] * 100
+        var_95 = abs(stats["var"]) * 100
 
         c1,c2,c3,c4,c5,c6=st.columns(6)
         with c1:
@@ -235,9 +241,33 @@ def run_ui_single_asset():
         with c6:
             st.metric("VaR 95% (%)", f"{var_95:.2f}")
 
+        ################
+        # Sweep : toutes les fenetres d'un coup
+        if st.checkbox("Parameter sweep (window)"):
+            s1,s2=st.columns(2)
+            with s1:
+                window_range = st.slider(
+                    "Window range",
+                    min_value=1,
+                    max_value=max(2, len(price) // 2),
+                    value=(5, min(100, max(2, len(price) // 2)))
+                )
+            with s2:
+                sweep_metric = st.selectbox("Metric", ["Sharpe", "CAGR", "MaxDrawdown"], key="sweep_metric_momentum")
+            if st.button("Run sweep"):
+                with span("strategy", "momentum sweep"):
+                    table = momentum_sweep(
+                        price_extended, start_ts, capital,
+                        range(window_range[0], window_range[1] + 1),
+                        rf=rf
+                    )
+                with span("chart", "sweep heatmap"):
+                    st.plotly_chart(sweep_heatmap(table, "window", sweep_metric), use_container_width=True)
+                st.dataframe(table)
+
 
     elif strategy == "DCA – Dollar Cost Averaging": # troisieme strategie
-        cc1,cc2=st.columns(2)
+        cc1,cc2,cc3=st.columns(3)
         with cc1:
             Amount = st.number_input(
                 "Amount ReInvest ",
@@ -246,50 +276,49 @@ def run_ui_single_asset():
                 value=100
             )
         with cc2:
-            freq = st.number_input(
-                "Freq of ReInvest ",
-                min_value=0,
-                max_value=len(data),
-                value=15
+            schedule = st.selectbox(
+                "ReInvest schedule",
+                ["Every X days", "Weekly", "Monthly"],
+                index=0
             )
+        with cc3:
+            if schedule == "Every X days":
+                freq = st.number_input(
+                    "Freq of ReInvest ",
+                    min_value=0,
+                    max_value=len(data),
+                    value=15
+                )
+            else:
+                freq = schedule.lower()
 
-        result, average_buy,size_invest = DCA(price_extended,start_date_invest,capital,freq,Amount)
+        with span("strategy", strategy):
+            schedule = dca_schedule(price_extended,start_date_invest,capital,freq,Amount)
+            result = schedule[["Portefeuille"]]
+            average_buy, size_invest = schedule["AverageCost"].iloc[-1], schedule["Invested"].iloc[-1]
         
-        fig = go.Figure()
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Scatter(
-            x=result.index,
-            y=result["Portefeuille"],
-            mode="lines",
-            name="Investement Strategy"
-        ), secondary_y=False)
-        fig.add_trace(go.Scatter(
-            x=data.index,
-            y=price,
-            mode="lines",
-            name=asset
-        ), secondary_y=True)
-        if show_forecast:
-            fig.add_trace(go.Scatter(
-                x=forecast_df["forecast"].index,
-                y=forecast_df["forecast"],
-                mode="lines",
-                name="Prediction"
-            ), secondary_y=True)
-        fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
-        fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
-        fig.update_layout(
-            title="Investement evolution",
-            xaxis_title="Date",
-            height=500  
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("chart", strategy):
+            fig = go.Figure()
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(line_trace(result["Portefeuille"], "Investement Strategy", window=zoom), secondary_y=False)
+            fig.add_trace(line_trace(price, asset, window=zoom), secondary_y=True)
+            if forecast_df is not None:
+                fig.add_trace(line_trace(forecast_df["forecast"], "Prediction", window=zoom), secondary_y=True)
+            fig.update_yaxes(title_text="Portfolio Value", secondary_y=False)
+            fig.update_yaxes(title_text=f"{asset} Price", secondary_y=True)
+            fig.update_layout(
+                title="Investement evolution",
+                xaxis_title="Date",
+                height=500  
+            )
+            st.plotly_chart(fig, use_container_width=True)
   
-        result=result[result["Portefeuille"]!=0]
-        result=portfolio_return(result)
-        result.dropna(inplace=True)
-        max_drawdow=max_drawdown(result)
-        sortino_val = sortino_ratio(result, rf=rf) 
+        with span("metrics", strategy):
+            # Sortino et drawdown sur la valeur nette des versements (sinon les apports passent pour du rendement)
+            key = ("single", asset, interval, strategy, start_ts, capital, freq, Amount)
+            stats = online_strategy_metrics(key, dca_time_weighted(schedule), rf, periods)
+        max_drawdow = stats["max_drawdown"] * 100
+        sortino_val = stats["sortino"]
         V_f = result["Portefeuille"].iloc[-1]
         total_invested = size_invest
         total_return = (V_f - total_invested) / total_invested
@@ -306,5 +335,16 @@ def run_ui_single_asset():
         with c5:
             st.metric("Total Return (%) : ",round(total_return*100,2))
 
-
-
+    ################
+    # Metriques glissantes sous la valeur de la strategie
+    if st.checkbox("Show rolling metrics"):
+        rolling_window = st.number_input(
+            "Rolling window (bars)",
+            min_value=5,
+            max_value=max(5, len(price)),
+            value=min(63, max(5, len(price) // 4))
+        )
+        with span("metrics", "rolling metrics"):
+            rolling = rolling_metrics(result["Portefeuille"], rolling_window, rf, periods)
+        with span("chart", "rolling metrics"):
+            st.plotly_chart(rolling_metrics_figure(rolling, zoom), use_container_width=True)
@@ -0,0 +1,166 @@
+# Cas de benchmark : chaque cas construit ses donnees synthetiques (rows x assets) puis renvoie
+# la fonction a chronometrer. kind = "series" (un actif), "panel" (plusieurs actifs) ou "store".
+import atexit
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from backtest.metrics import metrics_kernel
+from backtest.online import OnlineMetrics
+from backtest.rolling import rolling_metrics
+from backtest.sweep import momentum_sweep
+from market_data.providers import FakeProvider
+from market_data.store import PriceStore
+from portfolio.analytics.correlation import correlation_matrix, rolling_correlation
+from portfolio.analytics.metrics import max_draw, portfolio_metrics, vol_portfolio
+from portfolio.strategies.alloc_return import rebalancing_proportional_returns
+from portfolio.strategies.allocation import allocation_hold
+from portfolio.strategies.rebalancing import rebalancing
+from single_asset.analytics.metrics import max_drawdown, strategy_metrics
+from single_asset.strategies.DCA import DCA
+from single_asset.strategies.buy_and_hold import buy_and_hold
+from single_asset.strategies.momentum import run_momentum
+
+# Tailles balayees par suite ; les combinaisons au-dela de max_cells (ou de la limite du cas) sont sautees.
+SUITES = {
+    "quick": {"rows": [1_000, 10_000, 100_000], "assets": [3, 30], "max_cells": 3_000_000},
+    "full": {"rows": [1_000, 10_000, 100_000, 1_000_000], "assets": [3, 30, 300, 1_000], "max_cells": 30_000_000},
+}
+
+
+def price_index(rows: int) -> pd.DatetimeIndex:
+    # Jours ouvres tant que les dates restent representables, minutes au-dela.
+    if rows <= 20_000:
+        return pd.bdate_range("2000-01-03", periods=rows)
+    return pd.date_range("2000-01-03", periods=rows, freq="min")
+
+
+def gbm_prices(rows: int, assets: int, seed: int = 0) -> pd.DataFrame:
+    # Prix log-normaux correles (un facteur commun), reproductibles.
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.008, (rows, 1))
+    returns = market + rng.normal(0.0002, 0.012, (rows, assets))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    return pd.DataFrame(prices, index=price_index(rows), columns=[f"A{i}" for i in range(assets)])
+
+
+def series_case(func):
+    def setup(rows, assets):
+        price = gbm_prices(rows, 1)["A0"]
+        return lambda: func(price)
+    return setup
+
+
+def panel_case(func):
+    def setup(rows, assets):
+        data = gbm_prices(rows, assets)
+        weights = [1 / assets] * assets
+        return lambda: func(data, weights)
+    return setup
+
+
+def portfolio_values(rows: int) -> pd.Series:
+    # Trajectoire buy & hold sans la ligne nulle du jour d'achat.
+    values = buy_and_hold(gbm_prices(rows, 1)["A0"], pd.Timestamp("2000-01-03"), 1000)["Portefeuille"]
+    return values[values > 0]
+
+
+def values_case(func):
+    def setup(rows, assets):
+        values = portfolio_values(rows)
+        return lambda: func(values)
+    return setup
+
+
+def returns_case(func):
+    def setup(rows, assets):
+        returns = gbm_prices(rows, assets).pct_change().dropna()
+        weights = np.full(assets, 1 / assets)
+        return lambda: func(returns, weights)
+    return setup
+
+
+def scratch_folder() -> str:
+    # Dossier temporaire des bases SQLite, supprime a la fin du processus.
+    folder = tempfile.mkdtemp(prefix="bench_store_")
+    atexit.register(shutil.rmtree, folder, True)
+    return folder
+
+
+def store_fetch_setup(rows, assets):
+    # Remplissage a froid d'une base neuve depuis le faux fournisseur (telechargement + ecriture SQLite).
+    end = price_index(min(rows, 20_000))[-1] + pd.Timedelta(days=1)
+    tickers = [f"T{i}" for i in range(assets)]
+    folder = scratch_folder()
+    runs = iter(range(10 ** 6))
+
+    def run():
+        store = PriceStore(os.path.join(folder, f"{next(runs)}.db"))
+        return store.fetch_many(tickers, "2000-01-03", end, provider=FakeProvider())
+    return run
+
+
+def store_read_setup(rows, assets):
+    # Lecture d'une base deja remplie (chemin de la page portefeuille apres le premier chargement).
+    end = price_index(min(rows, 20_000))[-1] + pd.Timedelta(days=1)
+    tickers = [f"T{i}" for i in range(assets)]
+    store = PriceStore(os.path.join(scratch_folder(), "prices.db"))
+    store.fetch_many(tickers, "2000-01-03", end, provider=FakeProvider())
+    return lambda: store.read_many(tickers, "2000-01-03", end)
+
+
+def online_setup(rows, assets):
+    values = portfolio_values(rows)
+    return lambda: OnlineMetrics().update(values.to_numpy(), values.index).metrics()
+
+
+START = pd.Timestamp("2000-01-03")
+
+# nom -> (kind, setup(rows, assets) -> fonction sans argument, limite(rows, assets) -> bool ou None)
+CASES = {
+    "buy_and_hold": ("series", series_case(lambda p: buy_and_hold(p, START, 1000)), None),
+    "run_momentum": ("series", series_case(lambda p: run_momentum(p, START, 1000, 20)), None),
+    "momentum_sweep_50_windows": ("series", series_case(lambda p: momentum_sweep(p, START, 1000, range(5, 55))), None),
+    "dca_every_15_days": ("series", series_case(lambda p: DCA(p, START, 10_000, 15, 100)), None),
+    "dca_monthly": ("series", series_case(lambda p: DCA(p, START, 10_000, "monthly", 100)), None),
+    "strategy_metrics": ("series", values_case(lambda v: strategy_metrics(v, 0.02)), None),
+    "max_drawdown": ("series", values_case(lambda v: max_drawdown(pd.DataFrame({"Portefeuille": v}))), None),
+    "portfolio_metrics": ("series", values_case(portfolio_metrics), None),
+    "metrics_kernel": ("series", values_case(lambda v: metrics_kernel(v.to_numpy())), None),
+    "rolling_metrics": ("series", values_case(lambda v: rolling_metrics(v, 63)), None),
+    "online_metrics": ("series", online_setup, None),
+    "allocation_hold": ("panel", panel_case(lambda d, w: allocation_hold(d, list(d.columns), w, 1000)), None),
+    "rebalancing": ("panel", panel_case(lambda d, w: rebalancing(d, 1000, 30, w)), None),
+    "rebalancing_month_end": ("panel", panel_case(lambda d, w: rebalancing(d, 1000, "month-end", w)), None),
+    "rebalancing_drift_band": ("panel", panel_case(lambda d, w: rebalancing(d, 1000, 0, w, band=0.01)), None),
+    "proportional_returns": ("panel", panel_case(lambda d, w: rebalancing_proportional_returns(d, 1000, 30, 30)), None),
+    "max_draw": ("panel", returns_case(max_draw), None),
+    "vol_portfolio": ("panel", returns_case(vol_portfolio), None),
+    "correlation_matrix": ("panel", panel_case(lambda d, w: correlation_matrix(d)), None),
+    # une boucle Python par barre en O(assets^2)
+    "rolling_correlation": ("panel", panel_case(lambda d, w: rolling_correlation(d, 63)),
+                            lambda rows, assets: rows <= 10_000 and rows * assets ** 2 <= 3e7),
+    "store_fetch_cold": ("store", store_fetch_setup, None),
+    "store_read_warm": ("store", store_read_setup, None),
+}
+
+
+def sizes(name: str, suite: str) -> list:
+    # Combinaisons (rows, assets) executees pour ce cas dans cette suite.
+    kind, _, limit = CASES[name]
+    spec = SUITES[suite]
+    assets_list = [1] if kind == "series" else spec["assets"]
+    # la base SQLite stocke des jours ouvres : 20 000 lignes au plus par ticker
+    rows_list = [r for r in spec["rows"] if kind != "store" or r <= 20_000]
+    combos = []
+    for rows in rows_list:
+        for assets in assets_list:
+            if rows * assets > spec["max_cells"]:
+                continue
+            if limit is not None and not limit(rows, assets):
+                continue
+            combos.append((rows, assets))
+    return combos
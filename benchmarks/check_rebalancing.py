@@ -0,0 +1,103 @@
+# Controle du moteur de rebalancement (segments.py) contre la boucle ligne par ligne d'origine.
+# Lance par benchmarks/run.py avant les mesures ; utilisable seul :
+#   python benchmarks/check_rebalancing.py
+# Code de sortie 1 si un portefeuille ou un jeu de lignes de rebalancement differe de la reference.
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+from cases import gbm_prices
+from portfolio.strategies.rebalancing import rebalancing
+from portfolio.strategies.segments import CALENDAR_RULES, calendar_rows
+
+TOLERANCE = 1e-12
+# Periodes pandas equivalentes aux calendriers (semaine du lundi au dimanche)
+PERIODS = {"week": "W-SUN", "month": "M", "quarter": "Q", "year": "Y"}
+
+
+def reference_calendar(index: pd.DatetimeIndex, rule: str) -> set:
+    # Premiere ou derniere ligne de chaque periode, comparee a la ligne voisine avec pandas.
+    period, keep = CALENDAR_RULES[rule]
+    periods = index.to_period(PERIODS[period])
+    rows = {0}
+    for i in range(len(index)):
+        if keep == "first" and i > 0 and periods[i] != periods[i - 1]:
+            rows.add(i)
+        # la derniere ligne n'a pas de suivante : la derniere periode (incomplete) n'a pas de fin
+        if keep == "last" and i + 1 < len(index) and periods[i] != periods[i + 1]:
+            rows.add(i)
+    return rows
+
+
+def reference_rebalancing(data: pd.DataFrame, capital: float, freq, weights: list, band: float = None) -> tuple:
+    # Boucle historique : on reinvestit la valeur de la ligne precedente aux poids cibles.
+    # Avec band, on ne rebalance une ligne permise que si un poids a derive de plus de band a la ligne precedente.
+    prices = data.to_numpy(dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if isinstance(freq, str):
+        allowed = reference_calendar(data.index, freq)
+    elif freq:
+        allowed = set(range(0, len(prices), freq))
+    else:
+        allowed = set(range(len(prices))) if band else {0}
+    value = np.zeros(len(prices))
+    size = np.zeros(prices.shape[1])
+    cash = capital
+    rows = []
+    for i in range(len(prices)):
+        rebalance = i == 0 or i in allowed
+        if i > 0 and band:
+            held = size * prices[i - 1]
+            rebalance = rebalance and bool((np.abs(held / held.sum() - weights) > band).any())
+        if rebalance:
+            size = cash * weights / prices[i]
+            rows.append(i)
+        value[i] = np.sum(size * prices[i])
+        cash = value[i]
+    return value, rows
+
+
+def check() -> list:
+    # Renvoie la liste des ecarts (vide si tout concorde).
+    failures = []
+    data = gbm_prices(800, 4, seed=3)
+    weights = [0.4, 0.3, 0.2, 0.1]
+    # debut un mercredi en milieu de mois, fin en milieu de trimestre : premiere ligne et periode incomplete
+    data.index = pd.bdate_range("2001-02-14", periods=len(data))
+    configs = [(freq, None) for freq in [0, 1, 21, 63, 1000]]
+    configs += [(rule, None) for rule in CALENDAR_RULES]
+    configs += [(0, band) for band in [0.01, 0.05]]
+    configs += [(21, 0.03), ("month-end", 0.02), ("weekly", 0.01)]
+    for length in [len(data), 1, 2, 37]:
+        sample = data.iloc[:length]
+        for freq, band in configs:
+            expected, rows = reference_rebalancing(sample, 10_000, freq, weights, band)
+            got = rebalancing(sample, 10_000, freq, weights, band=band).to_numpy()
+            error = np.max(np.abs(got / expected - 1))
+            if error > TOLERANCE:
+                failures.append(f"rebalancing(rows={length}, freq={freq!r}, band={band}): relative error {error:.2e}")
+    for rule in CALENDAR_RULES:
+        expected = sorted(reference_calendar(data.index, rule))
+        got = calendar_rows(data.index, rule).tolist()
+        if got != expected:
+            failures.append(f"calendar_rows({rule!r}): {len(got)} rows, expected {len(expected)}")
+        elif got[0] != 0 or (CALENDAR_RULES[rule][1] == "last" and got[-1] == len(data) - 1):
+            failures.append(f"calendar_rows({rule!r}): first row missing or partial last period closed")
+    return failures
+
+
+def main() -> int:
+    failures = check()
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    print(f"Rebalancing self-check: {'FAILED' if failures else 'ok'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# Benchmarks des strategies, metriques et chemins de donnees sur des prix synthetiques.
+# Usage :
+#   python benchmarks/run.py                      # suite rapide, comparee a benchmarks/baseline.json
+#   python benchmarks/run.py --suite full --filter rebalancing
+#   python benchmarks/run.py --save-baseline      # remplace la reference par cette execution
+# Code de sortie 1 si un cas est plus lent que la reference au-dela de --tolerance,
+# ou si le controle du rebalancement contre la boucle de reference echoue (check_rebalancing.py).
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+import check_rebalancing
+from cases import CASES, SUITES, sizes
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Un ralentissement de moins de NOISE_FLOOR secondes est du bruit, quel que soit le ratio
+NOISE_FLOOR = 0.005
+
+
+def measure(run, repeat: int) -> dict:
+    # Meilleur temps sur `repeat` executions, puis pic memoire (tracemalloc) sur une execution a part
+    # pour ne pas fausser le chronometre.
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        began = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - began)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def case_key(name: str, rows: int, assets: int) -> str:
+    return f"{name}[rows={rows},assets={assets}]"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark strategies, metrics and data paths on synthetic prices.")
+    parser.add_argument("--suite", choices=list(SUITES), default="quick")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=1.3, help="slowdown ratio counted as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if check_rebalancing.main():
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results, regressions = {}, []
+    print(f"{'case':<52} {'time':>10} {'peak':>10} {'vs base':>8}")
+    for name in CASES:
+        if args.filter not in name:
+            continue
+        for rows, assets in sizes(name, args.suite):
+            key = case_key(name, rows, assets)
+            run = CASES[name][1](rows, assets)
+            result = measure(run, args.repeat)
+            results[key] = result
+            ratio = ""
+            reference = baseline.get(key)
+            if reference:
+                change = result["seconds"] / reference["seconds"]
+                ratio = f"{change:.2f}x"
+                if change > args.tolerance and result["seconds"] - reference["seconds"] > NOISE_FLOOR:
+                    regressions.append(key)
+                    ratio += " !"
+            print(f"{key:<52} {result['seconds'] * 1000:8.1f}ms {result['peak_mb']:8.1f}MB {ratio:>8}", flush=True)
+
+    record = {
+        "suite": args.suite,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=1)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)["results"]
+            record["results"] = {**previous, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.tolerance}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
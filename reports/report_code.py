@@ -1,39 +1,44 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
+# Rapport quotidien (cloture, volatilite, drawdown) de tous les actifs de la base locale.
+# Exemple de cron a 20h :
+#   0 20 * * 1-5 cd /path/to/dashboard && python reports/report_code.py >> logs/report.log 2>&1
+import argparse
 import os
-import yfinance as yf
-
-def enrgistrement_prices(tickers :list,start :str,end:str):
-    data = yf.download(tickers, start, end)["Close"]
-    data_file = r"C:\Users\bours\Documents\Esilv\A4\Python, Git and Linux\project_root\report\prices.csv"
-    data.to_csv(data_file)
-
-# Fichier des données (exemple)
-data_file = r"C:\Users\bours\Documents\Esilv\A4\Python, Git and Linux\project_root\report\prices.csv"
-
-# Lecture des données
-df = pd.read_csv(data_file, parse_dates=['Date'], index_col='Date')
-
-for asset in df.columns:
-    # Calculs quotidiens
-    volatility = df[asset].pct_change().std()  # volatilité
-    close_price = df[asset].iloc[-1]
-    max_drawdown = ((df[asset].cummax() - df[asset]) / df[asset].cummax()).max()
-
-    # Créer dossier report si nécessaire
-    report_dir = r"C:\Users\bours\Documents\Esilv\A4\Python, Git and Linux\project_root\reports"
-    os.makedirs(report_dir, exist_ok=True)
-
-    # Nom du fichier report
-    now = datetime.now().strftime("%Y-%m-%d")
-    report_file = os.path.join(report_dir, f"daily_report_{now}.txt")
-
-    # Écriture du report
-    with open(report_file, 'w') as f:
-        f.write(f"Daily Report: {now}\n")
-        f.write(f"Close Price: {close_price}\n")
-        f.write(f"Volatility: {volatility:.4f}\n")
-        f.write(f"Max Drawdown: {max_drawdown:.4f}\n")
-
-    print(f"Report saved to {report_file}")
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+from market_data.report import STALE_DAYS, run_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the daily report from the local price store.")
+    parser.add_argument("--tickers", nargs="*", help="tickers to report (default: every ticker in the store)")
+    parser.add_argument("--start", help="first date (default: one year before --end)")
+    parser.add_argument("--end", help="last date, excluded (default: tomorrow)")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--out", default=os.path.join(ROOT, "reports"), help="output folder")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--store", help="path of the SQLite price store")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    table, files, elapsed, stale = run_report(
+        args.tickers, args.start, args.end, args.interval, args.out, args.format, args.store, args.workers
+    )
+    for path in files:
+        print(f"Report saved to {path}")
+    print(f"{len(table)} assets in {elapsed:.1f}s")
+    # code de sortie non nul : le cron doit voir une base vide ou qui n'est plus mise a jour
+    if table.empty:
+        print(f"ERROR: no {args.interval} data in the requested period, the price store is empty or stale.", file=sys.stderr)
+        sys.exit(1)
+    if stale:
+        print(f"WARNING: {len(stale)} of {len(table)} assets have no bar in the last {STALE_DAYS} days: "
+              f"{', '.join(stale[:20])}{' ...' if len(stale) > 20 else ''}", file=sys.stderr)
+        if len(stale) == len(table):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Cout d'import (demarrage a froid) de chaque page de l'application, mesure avec python -X importtime
+# dans un interpreteur neuf. Usage : python scripts/import_report.py [--repeat 3] [--top 10] [--log]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app")
+
+# Modules importes par main.py avant le premier affichage de la page Home
+HOME = ["streamlit", "market_data.cache", "backtest.online", "portfolio.data.fetch_api"]
+
+# Imports supplementaires de chaque fonctionnalite, mesures en plus de HOME
+FEATURES = {
+    "Home chart": ["plotly.graph_objects", "charts.decimate"],
+    "Single asset page": ["single_asset.ui_single_asset"],
+    "Portfolio page": ["portfolio.ui_portfolio"],
+    "Forecast (pmdarima)": ["single_asset.analytics.forecast", "pmdarima"],
+}
+
+
+def import_times(modules: list) -> tuple:
+    # (total en ms, {module de premier niveau: cumul en ms}) pour importer `modules` a froid.
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    env = {**os.environ, "PYTHONPATH": APP + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    done = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, cwd=APP)
+    if done.returncode != 0:
+        raise ImportError(done.stderr.strip().splitlines()[-1])
+    per_module = {}
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):   # niveau 0 : le cumul inclut deja les sous-imports
+            per_module[name.strip()] = int(cumulative) / 1000
+    return sum(per_module.values()), per_module
+
+
+def best_of(modules: list, repeat: int) -> tuple:
+    runs = [import_times(modules) for _ in range(repeat)]
+    return min(runs, key=lambda run: run[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import cost of each page of the dashboard.")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    parser.add_argument("--top", type=int, default=8, help="heaviest modules listed per feature")
+    parser.add_argument("--log", action="store_true", help="append the totals to logs/import_report.jsonl")
+    args = parser.parse_args(argv)
+
+    record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0]}
+    try:
+        home_total, home_modules = best_of(HOME, args.repeat)
+    except ImportError as e:
+        parser.exit(1, f"Home imports failed: {e}\n")
+    record["Home"] = round(home_total, 1)
+    print(f"{'Home':<22} {home_total:8.1f} ms")
+    for name, ms in sorted(home_modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"    {name:<30} {ms:8.1f} ms")
+
+    for feature, modules in FEATURES.items():
+        try:
+            total, per_module = best_of(HOME + modules, args.repeat)
+        except ImportError as e:
+            print(f"{feature:<22} unavailable ({e})")
+            continue
+        extra = {m: ms for m, ms in per_module.items() if m not in home_modules}
+        record[feature] = round(total - home_total, 1)
+        print(f"{feature:<22} {total - home_total:+8.1f} ms")
+        for module, ms in sorted(extra.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {module:<30} {ms:8.1f} ms")
+
+    if args.log:
+        os.makedirs(os.path.join(ROOT, "logs"), exist_ok=True)
+        with open(os.path.join(ROOT, "logs", "import_report.jsonl"), "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from market_data.bars import BarStore
+from market_data.cache import TTLCache, cached
+from market_data import cache
+
+
+def bars(start: str, periods: int, level: float) -> pd.DataFrame:
+    # Toutes les colonnes d'une barre portent la meme valeur : une barre melangee se voit tout de suite.
+    index = pd.date_range(start, periods=periods, freq="min", name="Date")
+    values = level + np.arange(periods, dtype=float)
+    return pd.DataFrame({c: values for c in ["Open", "High", "Low", "Close", "Volume"]}, index=index)
+
+
+def revise_last_bar(root: str, rounds: int):
+    store = BarStore(root)
+    for i in range(rounds):
+        # la derniere barre change a chaque tour (reecriture), puis une barre est ajoutee (ajout)
+        store.append("AAA", "1m", bars("2024-01-02 10:00", 200 + i, 1000.0 * (i + 1)).iloc[-2:])
+
+
+def test_frame_read_before_a_revision_never_changes(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append("AAA", "1m", bars("2024-01-02 10:00", 50, 0.0))
+    before = store.frame("AAA", "1m")
+    snapshot = before.copy()
+    store.append("AAA", "1m", bars("2024-01-02 10:49", 3, 500.0))
+    pd.testing.assert_frame_equal(before, snapshot)
+    after = store.frame("AAA", "1m")
+    assert len(after) == 52 and after["Close"].iloc[-3] == 500.0
+    assert (after.to_numpy() == after[["Open"]].to_numpy()).all()
+
+
+def test_readers_in_other_process_see_whole_bars(tmp_path):
+    root = str(tmp_path)
+    store = BarStore(root)
+    store.append("AAA", "1m", bars("2024-01-02 10:00", 200, 0.0))
+    writer = multiprocessing.get_context("spawn").Process(target=revise_last_bar, args=(root, 40))
+    writer.start()
+    while writer.is_alive():
+        frame = store.frame("AAA", "1m")
+        assert frame.index.is_monotonic_increasing
+        assert (frame.to_numpy() == frame[["Open"]].to_numpy()).all()
+    writer.join()
+    assert writer.exitcode == 0
+
+
+def test_cached_frames_share_memory_but_not_writes(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE", TTLCache())
+    source = bars("2024-01-02 10:00", 10, 0.0)
+
+    @cached
+    def load(ticker):
+        return source
+
+    first, second = load("AAA"), load("AAA")
+    assert first is not second
+    assert np.shares_memory(first["Close"].to_numpy(), source["Close"].to_numpy())
+    first.loc[first.index[0], "Close"] = -1.0
+    assert second["Close"].iloc[0] == 0.0
@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+import types
+
+import pandas as pd
+
+from market_data import batch
+from market_data.batch import download_batch, download_group
+from market_data.providers import FakeProvider, YahooProvider, empty_frame
+
+
+class FlakyProvider(FakeProvider):
+    # Comme yfinance : un ticker en echec revient vide (sans exception) lors des `flaky` premieres requetes.
+    def __init__(self, flaky: int, **kwargs):
+        super().__init__(**kwargs)
+        self.flaky = flaky
+        self.asked = []
+
+    def download_many(self, tickers, start, end, interval="1d"):
+        self.asked.append(list(tickers))
+        frames = super().download_many(tickers, start, end, interval)
+        if len(self.asked) <= self.flaky:
+            frames[tickers[0]] = empty_frame()
+        return frames
+
+
+def test_empty_result_is_retried_for_missing_tickers_only():
+    provider = FlakyProvider(flaky=1)
+    frames, errors = download_group(provider, ["AAA", "BBB"], "2024-01-01", "2024-02-01", backoff=0)
+    assert sorted(frames) == ["AAA", "BBB"] and errors == {}
+    assert provider.asked == [["AAA", "BBB"], ["AAA"]]
+
+
+def test_ticker_still_empty_after_retries_is_reported(monkeypatch):
+    monkeypatch.setattr(batch.time, "sleep", lambda seconds: None)
+    provider = FakeProvider(failing=("BAD",))
+    frames, errors = download_batch(["AAA", "BAD"], "2024-01-01", "2024-02-01", provider=provider, batch_size=1)
+    assert list(frames) == ["AAA"]
+    assert errors == {"BAD": "no data"}
+    # 1 requete pour AAA, RETRIES pour BAD
+    assert provider.requests == 1 + batch.RETRIES
+
+
+def test_yahoo_downloads_never_overlap(monkeypatch):
+    # Faux module yfinance qui detecte deux appels simultanes a yf.download.
+    state = {"inside": 0, "overlap": False}
+
+    def download(tickers, **kwargs):
+        state["inside"] += 1
+        state["overlap"] |= state["inside"] > 1
+        time.sleep(0.01)
+        state["inside"] -= 1
+        index = pd.date_range("2024-01-01", periods=3, name="Date")
+        columns = pd.MultiIndex.from_product([list(tickers), ["Open", "High", "Low", "Close", "Volume"]])
+        return pd.DataFrame(1.0, index=index, columns=columns)
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+    provider = YahooProvider()
+    threads = [threading.Thread(target=provider.download_many, args=([f"T{i}"], "2024-01-01", "2024-01-04"))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not state["overlap"]
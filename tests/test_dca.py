@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.engine import run_backtests
+from single_asset.strategies.DCA import dca_money_weighted, dca_schedule, dca_time_weighted
+
+
+def closes(growth: float = 0.0) -> pd.DataFrame:
+    index = pd.bdate_range("2020-01-01", periods=600)
+    return pd.DataFrame({"AAA": 100 * (1 + growth) ** np.arange(600)}, index=index)
+
+
+def test_flat_price_has_no_return_despite_contributions():
+    schedule = dca_schedule(closes()["AAA"], "2020-01-01", 1000, "monthly", 100)
+    assert schedule["Portefeuille"].iloc[-1] > 2 * 1000
+    nav = dca_time_weighted(schedule)
+    assert nav[nav > 0].iloc[-1] == pytest.approx(nav[nav > 0].iloc[0])
+    assert dca_money_weighted(schedule) == pytest.approx(0, abs=1e-9)
+
+
+def test_engine_reports_dca_net_of_contributions():
+    data = closes(0.0005)
+    dca = run_backtests("dca", data, grid={"freq": ["weekly", "monthly", 15]}, params={"amount": 100},
+                        start="2020-01-01", max_workers=1)
+    hold = run_backtests("buy_and_hold", data, start="2020-01-01", max_workers=1)
+    assert list(dca["freq"]) == ["weekly", "monthly", 15]
+    # toujours investi dans le seul actif : le rendement pondere par le temps est celui du buy and hold
+    assert np.allclose(dca["cagr"], hold["cagr"].iloc[0])
+    assert (dca["final_value"] > dca["invested"]).all()
+    assert (dca["money_weighted_return"] > 0).all()
@@ -0,0 +1,23 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from single_asset.analytics.forecast_jobs import forecasts_in_background
+
+
+def test_several_tickers_and_horizons_are_forecast_in_background():
+    index = pd.bdate_range("2023-01-02", periods=120)
+    rng = np.random.default_rng(0)
+    series = {t: pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 120))), index=index, name=t)
+              for t in ["AAA", "BBB"]}
+    deadline = time.time() + 300
+    while True:
+        statuses = forecasts_in_background(series, [5, 10])
+        if not any(running for _, running, _ in statuses.values()) or time.time() > deadline:
+            break
+        time.sleep(0.5)
+    assert list(statuses) == [("AAA", 5), ("AAA", 10), ("BBB", 5), ("BBB", 10)]
+    for (ticker, horizon), (forecast, running, error) in statuses.items():
+        assert error is None and not running
+        assert len(forecast) == horizon and forecast.index[0] > index[-1]
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.metrics import metrics_kernel
+from portfolio.analytics.metrics import VaR, max_draw, sharpe_ratio, vol_portfolio
+
+
+def returns() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    return pd.DataFrame(rng.normal(0.0003, 0.01, (500, 3)), columns=["A", "B", "C"])
+
+
+def test_max_draw_keeps_first_value_as_first_peak():
+    # premier rendement negatif : l'ancienne definition part de la valeur apres ce rendement
+    r = pd.Series([-0.05, 0.01, 0.02, -0.01, 0.03])
+    growth = (1 + r).cumprod()
+    assert max_draw(r) == pytest.approx((growth / growth.cummax() - 1).min())
+    # le noyau sur rendements compte le capital initial comme sommet
+    assert metrics_kernel(r.to_numpy(), kind="returns")["max_drawdown"] == pytest.approx(growth.min() - 1)
+
+
+def test_portfolio_wrappers_match_historical_formulas():
+    data, weights = returns(), [0.5, 0.3, 0.2]
+    portfolio = data @ weights
+    vol = np.sqrt(np.array(weights) @ (data.cov() * 252) @ np.array(weights))
+    assert vol_portfolio(data, weights) == pytest.approx(vol)
+    assert sharpe_ratio(data, weights, 0.03) == pytest.approx((portfolio.mean() * 252 - 0.03) / vol)
+    assert VaR(data, weights) == pytest.approx(portfolio.quantile(0.05))
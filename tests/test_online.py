@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import online
+from backtest.online import OnlineMetrics, online_strategy_metrics
+from single_asset.analytics.metrics import strategy_metrics
+from single_asset.strategies.momentum import run_momentum
+
+
+def prices(rows: int) -> pd.Series:
+    rng = np.random.default_rng(4)
+    index = pd.bdate_range("2020-01-01", periods=rows)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, rows))), index=index)
+
+
+def test_strategy_path_refresh_only_adds_new_bars(monkeypatch):
+    monkeypatch.setattr(online, "STATES", online.OrderedDict())
+    updated = []
+    original = OnlineMetrics.update
+
+    def counting_update(self, values, times):
+        updated.append(len(values))
+        return original(self, values, times)
+
+    monkeypatch.setattr(OnlineMetrics, "update", counting_update)
+    price = prices(800)
+    key = ("single", "AAA", "momentum", 20)
+    online_strategy_metrics(key, run_momentum(price.iloc[:795], price.index[0], 1000, 20)["Portefeuille"], 0.02)
+    updated.clear()
+    path = run_momentum(price, price.index[0], 1000, 20)["Portefeuille"]
+    stats = online_strategy_metrics(key, path, 0.02)
+    # 5 nouvelles barres + la barre provisoire precedente, rejouee
+    assert sum(updated) == 6
+    expected = strategy_metrics(path, 0.02)
+    for name, value in stats.items():
+        assert value == pytest.approx(float(expected[name]), rel=1e-9)
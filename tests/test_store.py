@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from market_data import batch
+from market_data.providers import CsvProvider
+from market_data.store import PriceStore
+
+
+class CountingCsvProvider(CsvProvider):
+    # CsvProvider qui garde la trace des plages demandees.
+    def __init__(self, folder: str):
+        super().__init__(folder)
+        self.calls = []
+
+    def download(self, ticker, start, end, interval="1d"):
+        self.calls.append((ticker, pd.Timestamp(start), pd.Timestamp(end)))
+        return super().download(ticker, start, end, interval)
+
+
+@pytest.fixture
+def provider(tmp_path):
+    index = pd.bdate_range("2021-01-04", "2021-12-31", name="Date")
+    close = 100 + np.arange(len(index), dtype=float)
+    for ticker in ["AAA", "BBB"]:
+        pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1e6},
+                     index=index).to_csv(tmp_path / f"{ticker}.csv")
+    return CountingCsvProvider(str(tmp_path))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices.db"))
+
+
+def test_cold_fetch_downloads_the_whole_range(store, provider):
+    data = store.fetch("AAA", "2021-03-01", "2021-04-01", provider=provider)
+    assert provider.calls == [("AAA", pd.Timestamp("2021-03-01"), pd.Timestamp("2021-04-01"))]
+    assert data.index[0] == pd.Timestamp("2021-03-01") and data.index[-1] == pd.Timestamp("2021-03-31")
+    assert store.coverage("AAA") == (pd.Timestamp("2021-03-01").value, pd.Timestamp("2021-04-01").value)
+
+
+def test_fetch_extending_the_head_downloads_only_the_head(store, provider):
+    store.fetch("AAA", "2021-03-01", "2021-04-01", provider=provider)
+    data = store.fetch("AAA", "2021-02-01", "2021-04-01", provider=provider)
+    assert provider.calls[1:] == [("AAA", pd.Timestamp("2021-02-01"), pd.Timestamp("2021-03-01"))]
+    assert data.index[0] == pd.Timestamp("2021-02-01") and data.index.is_unique
+    assert len(data) == len(pd.bdate_range("2021-02-01", "2021-03-31"))
+
+
+def test_fetch_extending_the_tail_downloads_only_the_tail(store, provider):
+    store.fetch("AAA", "2021-03-01", "2021-04-01", provider=provider)
+    data = store.fetch("AAA", "2021-03-01", "2021-05-01", provider=provider)
+    assert provider.calls[1:] == [("AAA", pd.Timestamp("2021-04-01"), pd.Timestamp("2021-05-01"))]
+    assert data.index[-1] == pd.Timestamp("2021-04-30")
+    assert store.coverage("AAA")[1] == pd.Timestamp("2021-05-01").value
+
+
+def test_warm_read_does_not_call_the_provider(store, provider):
+    first = store.fetch("AAA", "2021-03-01", "2021-05-01", provider=provider)
+    calls = len(provider.calls)
+    # sous-plage et plage finissant un week-end deja couvert
+    again = store.fetch("AAA", "2021-03-01", "2021-05-01", provider=provider)
+    inner = store.fetch("AAA", "2021-03-15", "2021-04-03", provider=provider)
+    assert len(provider.calls) == calls
+    pd.testing.assert_frame_equal(again, first)
+    assert inner.index[0] == pd.Timestamp("2021-03-15") and inner.index[-1] == pd.Timestamp("2021-04-02")
+
+
+def test_fetch_many_fills_each_gap_once(store, provider, monkeypatch):
+    # ZZZ n'a pas de fichier : il est redemande (voir download_group) sans attendre
+    monkeypatch.setattr(batch.time, "sleep", lambda seconds: None)
+    store.fetch("AAA", "2021-03-01", "2021-04-01", provider=provider)
+    frames, errors = store.fetch_many(["AAA", "BBB", "ZZZ"], "2021-03-01", "2021-04-01", provider=provider)
+    assert sorted(frames) == ["AAA", "BBB"] and list(errors) == ["ZZZ"]
+    assert [call[0] for call in provider.calls[1:]].count("AAA") == 0
+    pd.testing.assert_frame_equal(frames["AAA"], store.read("AAA", "2021-03-01", "2021-04-01"))
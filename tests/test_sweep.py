@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.sweep import run_sweep
+from portfolio.strategies.rebalancing import rebalancing
+
+
+def prices() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (300, 3)), axis=0))
+    return pd.DataFrame(values, index=pd.bdate_range("2020-01-01", periods=300), columns=["A", "B", "C"])
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_mixed_type_grid_keeps_grid_order(max_workers):
+    grid = {"freq": ["weekly", "month-end", 21], "band": [None, 0.02]}
+    table = run_sweep(rebalancing, grid, {"data": prices(), "capital": 1000, "weights": [0.5, 0.3, 0.2]},
+                      max_workers=max_workers)
+    assert list(table["freq"]) == ["weekly", "weekly", "month-end", "month-end", 21, 21]
+    assert list(table["band"].fillna(0)) == [0, 0.02] * 3
+    assert "combo" not in table.columns
+    assert table["Sharpe"].notna().all()